@@ -0,0 +1,139 @@
+"""Streaming ZIP or tar archive of roster workbooks, written as records finish without intermediate files"""
+import csv
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz")
+
+MANIFEST_NAME = "manifest.csv"
+
+# Manifest columns, one row per workbook in archive order
+MANIFEST_FIELDS = (
+    "file", "employee_id", "employee_name", "start_date", "end_date", "months",
+    "work_days", "km", "amount", "odometer_start", "odometer_end"
+)
+
+
+def manifest_row(config, columns):
+    """
+    Totals of one employee's workbook for the manifest
+
+    Args:
+        config (dict): The generator's effective config
+        columns (dict): Trip columns as returned by FuelLogGenerator.trip_columns
+
+    Returns:
+        dict: Values keyed by MANIFEST_FIELDS, except ``file`` which the archive fills in
+    """
+    start, end = config["start_date"], config["end_date"]
+    work_days = len(columns["date"])
+    return {
+        "employee_id": config["employee"]["id"],
+        "employee_name": config["employee"]["name"],
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": end.strftime("%Y-%m-%d"),
+        "months": (end.year - start.year) * 12 + end.month - start.month + 1,
+        "work_days": work_days,
+        "km": columns["km"].sum().item() if work_days else 0,
+        "amount": columns["amount"].sum().item() if work_days else 0,
+        "odometer_start": columns["odometer_start"][0].item() if work_days else config["initial_odometer"],
+        "odometer_end": columns["odometer_end"][-1].item() if work_days else config["initial_odometer"]
+    }
+
+
+class BatchArchive:
+    """
+    Writes workbooks into one ZIP or tar archive as they arrive
+
+    Each workbook goes straight from memory into the archive, so the disk only
+    ever holds the archive itself. Entries keep the order they are added in and
+    share the batch's start time as their timestamp. Manifest rows are spooled
+    to a temporary file once they outgrow 1 MB and written as ``manifest.csv``,
+    the last entry, when the archive is closed. The xlsx files are already
+    compressed, so ZIP entries are stored as they are.
+    """
+
+    def __init__(self, path, output_format="zip"):
+        """
+        Args:
+            path (str): Archive file, replaced if it exists
+            output_format (str): One of ARCHIVE_FORMATS
+        """
+        if output_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {output_format}")
+
+        self.path = path
+        self.output_format = output_format
+        self.entries_written = 0
+        self._names = set()
+        self._timestamp = time.time()
+        self._manifest = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        self._write_manifest_row(MANIFEST_FIELDS)
+
+        if output_format == "zip":
+            self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+            self._tar = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(path, "w:gz" if output_format == "tar.gz" else "w")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_manifest_row(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        self._manifest.write(buffer.getvalue().encode())
+
+    def _write_entry(self, name, file, size, compress=False):
+        """Copy ``size`` bytes from a binary file object into a new entry"""
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, time.localtime(self._timestamp)[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+            with self._zip.open(info, "w") as entry:
+                shutil.copyfileobj(file, entry)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(self._timestamp)
+            self._tar.addfile(info, file)
+
+    def add(self, output_path, data, totals):
+        """
+        Add one workbook
+
+        Args:
+            output_path (str): The record's output path; its file name becomes the entry name
+            data (bytes): xlsx contents
+            totals (dict): Manifest values from manifest_row
+
+        Raises:
+            ValueError: If another workbook was already added under the same name
+        """
+        name = os.path.basename(output_path)
+        if name in self._names or name == MANIFEST_NAME:
+            raise ValueError(f"Duplicate archive entry: {name}")
+        self._names.add(name)
+
+        self._write_entry(name, io.BytesIO(data), len(data))
+        self._write_manifest_row([name] + [totals[field] for field in MANIFEST_FIELDS[1:]])
+        self.entries_written += 1
+
+    def close(self):
+        """Write the manifest and finish the archive"""
+        size = self._manifest.tell()
+        self._manifest.seek(0)
+        self._write_entry(MANIFEST_NAME, self._manifest, size, compress=True)
+        self._manifest.close()
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
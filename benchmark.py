@@ -0,0 +1,890 @@
+"""
+Benchmarks for FuelLogGenerator
+
+Usage:
+    python benchmark.py headers --sheets 500
+    python benchmark.py plan --years 10
+    python benchmark.py startup --runs 5
+    python benchmark.py suite --output results.json --baseline baseline.json
+    python benchmark.py logging --workbooks 50
+    python benchmark.py writers --workbooks 1000
+    python benchmark.py styling --rows 20000
+    python benchmark.py compact --months 12
+    python benchmark.py parallel --months 120 --jobs 8
+    python benchmark.py audit --workbooks 200 --jobs 8
+    python benchmark.py consolidate --workbooks 1000 --changed 20
+    python benchmark.py trip-log --rows 2000000
+    python benchmark.py schedules --months 120 --changes 120
+    python benchmark.py service --url http://127.0.0.1:8080 --requests 500 --concurrency 16
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from fuel_log_v2 import FuelLogGenerator, configure_logging
+from sheet_writers import WRITERS, OpenpyxlSheetWriter
+from trip_plan import build_trip_plan
+
+
+def _quiet_generator(config=None):
+    """Create a generator that only logs warnings and errors"""
+    logging.getLogger('FuelLogGenerator').setLevel(logging.WARNING)
+    return FuelLogGenerator(config)
+
+
+def _best_of(repeat, func):
+    """Run ``func`` ``repeat`` times and return the fastest wall time in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_headers(sheets=500, repeat=3):
+    """
+    Compare per-sheet header cost of rendering from scratch vs stamping the template
+
+    Returns:
+        dict: Microseconds per sheet for each strategy
+    """
+    generator = _quiet_generator()
+    start_date = generator.config["start_date"]
+    year, month = start_date.year, start_date.month
+    odometer_start = generator._month_start_odometer(year, month)
+    workbook = generator.workbook
+
+    def render_sheets(render):
+        for index in range(sheets):
+            render(OpenpyxlSheetWriter(workbook.create_sheet(title=f"Sheet{index}"), generator.cell_styles,
+                                       generator._get_style_arrays()))
+        for ws in list(workbook.worksheets):
+            workbook.remove(ws)
+
+    rebuild = _best_of(repeat, lambda: render_sheets(
+        lambda writer: generator._render_header_block(writer, year, month, odometer_start)))
+    template = _best_of(repeat, lambda: render_sheets(
+        lambda writer: generator._add_sheet_headers(writer, year, month, odometer_start)))
+
+    return {
+        "rebuild_us_per_sheet": rebuild / sheets * 1e6,
+        "template_us_per_sheet": template / sheets * 1e6
+    }
+
+
+def bench_styling(rows=20000, repeat=3):
+    """
+    Styling throughput: one attribute assignment per style component vs registered named styles
+
+    Rows of 11 cells cycle through the data, weekend and holiday styles like a
+    log book's day rows. Both workbooks are saved to memory to check that they
+    end up with the same style table.
+
+    Returns:
+        dict: Cells per second for each strategy and the cellXfs count of each saved file
+    """
+    import io
+    import re
+    import zipfile
+    from openpyxl import Workbook # type: ignore
+
+    cell_styles = _quiet_generator().cell_styles
+    row_styles = ("data", "data", "data", "data", "data", "weekend", "holiday")
+
+    def per_attribute(ws):
+        def write(row, column, value, style):
+            cell = ws.cell(row=row, column=column)
+            cell.value = value
+            for attribute, style_object in cell_styles[style].items():
+                setattr(cell, attribute, style_object)
+        return write
+
+    def registered(ws):
+        return OpenpyxlSheetWriter(ws, cell_styles).write
+
+    def style_sheet(make_writer):
+        workbook = Workbook()
+        write = make_writer(workbook.active)
+        for row in range(1, rows + 1):
+            style = row_styles[row % len(row_styles)]
+            for column in range(1, 12):
+                write(row, column, "", style)
+        return workbook
+
+    def cell_xfs(workbook):
+        output = io.BytesIO()
+        workbook.save(output)
+        styles_xml = zipfile.ZipFile(output).read("xl/styles.xml").decode()
+        return int(re.search(r'<cellXfs count="(\d+)"', styles_xml).group(1))
+
+    cells = rows * 11
+    attribute_s = _best_of(repeat, lambda: style_sheet(per_attribute))
+    registered_s = _best_of(repeat, lambda: style_sheet(registered))
+
+    return {
+        "per_attribute_cells_per_s": cells / attribute_s,
+        "registered_cells_per_s": cells / registered_s,
+        "per_attribute_cell_xfs": cell_xfs(style_sheet(per_attribute)),
+        "registered_cell_xfs": cell_xfs(style_sheet(registered))
+    }
+
+
+def bench_plan(years=10, repeat=5):
+    """
+    Time building a trip plan covering ``years`` years with ~20 holidays a year
+
+    Returns:
+        dict: Planned days and milliseconds per plan
+    """
+    start_date = date(2020, 1, 1)
+    end_date = date(2020 + years - 1, 12, 31)
+    holidays = [date(2020 + offset // 20, offset % 12 + 1, offset % 28 + 1) for offset in range(20 * years)]
+
+    plan = build_trip_plan(start_date, end_date, 10000, 110, 10, holidays)
+    elapsed = _best_of(repeat, lambda: build_trip_plan(start_date, end_date, 10000, 110, 10, holidays))
+
+    return {"days": len(plan), "plan_ms": elapsed * 1e3}
+
+
+def bench_startup(runs=5):
+    """
+    Measure cold-start latency of the CLI in fresh interpreter processes
+
+    Scenarios are ``python fuel_log_v2.py --help``, a bare ``import fuel_log_v2``
+    and generating a single month.
+
+    Returns:
+        dict: Median and minimum milliseconds per scenario
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fuel_log_v2.py")
+    scenarios = {
+        "help": [sys.executable, script, "--help"],
+        "import": [sys.executable, "-c", "import fuel_log_v2"],
+        "one_month": [sys.executable, script, "--start-date", "2025-04-01", "--end-date", "2025-04-30",
+                      "--output", "startup_benchmark.xlsx", "--no-cache"]
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(script))
+        for name, command in scenarios.items():
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command, cwd=work_dir, env=env, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                timings.append((time.perf_counter() - start) * 1e3)
+            results[name] = {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+
+    return results
+
+
+# Suite scenarios vary one axis at a time: range length, holiday count and batch size
+SUITE_SCENARIOS = (
+    [{"name": f"range_{months}m", "months": months, "holidays": 20, "batch": 1} for months in (1, 12, 60, 240)]
+    + [{"name": f"holidays_{holidays}", "months": 12, "holidays": holidays, "batch": 1} for holidays in (0, 20, 500)]
+    + [{"name": f"batch_{batch}", "months": 1, "holidays": 20, "batch": batch} for batch in (1, 100, 1000)]
+)
+
+# Generator phases reported by the suite, as recorded by GenerationMetrics
+SUITE_PHASES = ("odometer", "header", "data", "column_widths", "save")
+
+# Metrics compared against a stored baseline
+SUITE_METRICS = ("wall_s", "peak_rss_kb", "output_bytes")
+
+
+def _suite_config(months, holidays, index):
+    """Deterministic generator config for a suite scenario"""
+    start_date = date(2020, 4, 1)
+    last_month = start_date.month - 1 + months - 1
+    end_date = date(start_date.year + last_month // 12, last_month % 12 + 1, 28)
+
+    # Spread the holidays evenly over the range (long lists run past its end)
+    step = max((end_date - start_date).days // max(holidays, 1), 1)
+    holiday_list = [(start_date + timedelta(days=offset * step)).strftime("%Y-%m-%d") for offset in range(holidays)]
+
+    return {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "holidays": holiday_list,
+        "employee": {"id": f"BENCH{index:05d}"},
+        "output_file_path": f"benchmark_{index:05d}.xlsx",
+        "metrics": {"enabled": True},
+        "cache": {"enabled": False}
+    }
+
+
+def _run_scenario(scenario, work_dir):
+    """
+    Run one suite scenario; meant to execute in a fresh process so peak RSS is its own
+
+    Returns:
+        dict: Wall time, per-phase seconds, peak RSS and output size
+    """
+    import resource
+
+    os.chdir(work_dir)
+    phases = dict.fromkeys(SUITE_PHASES, 0.0)
+
+    output_bytes = 0
+    start = time.perf_counter()
+    for index in range(scenario["batch"]):
+        generator = _quiet_generator(_suite_config(scenario["months"], scenario["holidays"], index))
+        generator.generate_workbook()
+        for phase, seconds in generator.metrics.phase_totals().items():
+            phases[phase] = phases.get(phase, 0.0) + seconds
+        output_bytes += generator.metrics.saved_bytes
+        os.remove(generator.config["output_file_path"])
+    wall = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024  # macOS reports bytes, Linux kilobytes
+
+    phases["other"] = max(wall - sum(phases.values()), 0.0)
+    return {
+        "months": scenario["months"],
+        "holidays": scenario["holidays"],
+        "batch": scenario["batch"],
+        "wall_s": wall,
+        "phases_s": phases,
+        "peak_rss_kb": peak_rss,
+        "output_bytes": output_bytes
+    }
+
+
+def run_suite(only=None):
+    """
+    Run the benchmark suite, each scenario in its own spawned process
+
+    Args:
+        only (list): Scenario names to run; all when empty
+
+    Returns:
+        dict: Environment details and per-scenario results, ready to dump as JSON
+    """
+    scenarios = [scenario for scenario in SUITE_SCENARIOS if not only or scenario["name"] in only]
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {}
+    }
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scenario in scenarios:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results["scenarios"][scenario["name"]] = pool.submit(_run_scenario, scenario, work_dir).result()
+
+    return results
+
+
+def _run_logging_variant(level, workbooks, work_dir):
+    """
+    Generate ``workbooks`` one-month workbooks with logging configured at ``level``
+
+    Runs in a fresh process because logging is configured once per process;
+    ``"off"`` leaves logging unconfigured. Console output goes to /dev/null.
+    """
+    os.chdir(work_dir)
+    sys.stderr = open(os.devnull, 'w')
+    if level != "off":
+        configure_logging(level, log_file=os.path.join(work_dir, f"{level}.log"))
+
+    config = _suite_config(1, 20, 0)
+    start = time.perf_counter()
+    for _ in range(workbooks):
+        FuelLogGenerator(config).generate_workbook()
+    return (time.perf_counter() - start) / workbooks * 1e3
+
+
+def bench_logging(workbooks=50):
+    """
+    Measure logging overhead per workbook for each log level
+
+    Returns:
+        dict: Milliseconds per one-month workbook, keyed by level ("off" = no logging)
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for level in ("off", "quiet", "info"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[level] = pool.submit(_run_logging_variant, level, workbooks, work_dir).result()
+    return results
+
+
+def _run_writer_batch(writer, workbooks, months, work_dir):
+    """
+    Generate a batch of workbooks with one writer backend, in a fresh process so peak RSS is its own
+
+    Returns:
+        dict: Workbooks per second, peak RSS and average output size
+    """
+    import resource
+
+    os.chdir(work_dir)
+    output_bytes = 0
+    start = time.perf_counter()
+    for index in range(workbooks):
+        config = _suite_config(months, 20, index)
+        config["writer"] = writer
+        generator = _quiet_generator(config)
+        generator.generate_workbook()
+        output_bytes += generator.metrics.saved_bytes
+        os.remove(generator.config["output_file_path"])
+    wall = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024  # macOS reports bytes, Linux kilobytes
+
+    return {
+        "workbooks_per_s": workbooks / wall,
+        "peak_rss_kb": peak_rss,
+        "avg_output_bytes": output_bytes / workbooks
+    }
+
+
+def bench_writers(workbooks=1000, months=12):
+    """
+    Compare throughput and memory of the writer backends on a batch of workbooks
+
+    Backends whose package isn't installed are skipped.
+
+    Returns:
+        dict: Results of _run_writer_batch, keyed by writer
+    """
+    import importlib.util
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for writer in WRITERS:
+            if importlib.util.find_spec(writer) is None:
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[writer] = pool.submit(_run_writer_batch, writer, workbooks, months, work_dir).result()
+    return results
+
+
+def _post_configs(url, configs, timeout):
+    """
+    Post configs to a generation service over one keep-alive connection
+
+    Returns:
+        list: (status, latency in seconds, response bytes) per request
+    """
+    import http.client
+    from urllib.parse import urlsplit
+
+    target = urlsplit(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=timeout)
+    results = []
+    try:
+        for config in configs:
+            body = json.dumps(config).encode()
+            start = time.perf_counter()
+            try:
+                connection.request("POST", "/generate", body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                data = response.read()
+                status = response.status
+                if response.getheader("Connection", "").lower() == "close":
+                    connection.close()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status, data = 0, b""
+            results.append((status, time.perf_counter() - start, len(data)))
+    finally:
+        connection.close()
+    return results
+
+
+def bench_service(url, requests=500, concurrency=16, months=1, timeout=60.0):
+    """
+    Load test a running generation service (``fuel_log_v2.py serve``)
+
+    ``concurrency`` clients each post their share of configs back to back, every
+    config for a different employee ID. Status 0 counts connection errors.
+
+    Returns:
+        dict: Throughput, latency percentiles of successful requests, status
+            counts and the service's own /metrics snapshot
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.request import urlopen
+
+    start_date = date(2025, 4, 1)
+    end_date = date(2025 + (months + 3) // 12, (months + 3) % 12 + 1, 1) - timedelta(days=1)
+    configs = [
+        {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "initial_odometer": 10000 + index,
+            "employee": {"id": f"LOAD{index:05d}"}
+        }
+        for index in range(requests)
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        shares = pool.map(lambda offset: _post_configs(url, configs[offset::concurrency], timeout), range(concurrency))
+        results = [result for share in shares for result in share]
+    wall = time.perf_counter() - start
+
+    statuses = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(latency * 1e3 for status, latency, _ in results if status == 200)
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, round(fraction * (len(latencies) - 1)))] if latencies else float("nan")
+
+    with urlopen(url.rstrip("/") + "/metrics", timeout=timeout) as response:
+        service_metrics = json.load(response)
+
+    return {
+        "wall_s": wall,
+        "workbooks_per_s": statuses.get(200, 0) / wall,
+        "statuses": statuses,
+        "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+        "avg_response_bytes": sum(size for status, _, size in results if status == 200) / max(1, statuses.get(200, 0)),
+        "service": service_metrics
+    }
+
+
+def bench_compact(months=12, repeat=3):
+    """
+    Compare regular and compact output for each installed writer backend
+
+    Workbooks are saved to files, where xlsxwriter normally runs in constant_memory mode.
+
+    Returns:
+        dict: Per writer and mode: generation and openpyxl load times in
+            milliseconds (best of ``repeat``), file size and uncompressed XML size
+    """
+    import importlib.util
+    import zipfile
+    from openpyxl import load_workbook # type: ignore
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for writer in WRITERS:
+            if importlib.util.find_spec(writer) is None:
+                continue
+            for compact in (False, True):
+                config = _suite_config(months, 20, 0)
+                config.update({
+                    "writer": writer,
+                    "compact": compact,
+                    "output_file_path": os.path.join(work_dir, "compact.xlsx"),
+                    "metrics": {"enabled": False}
+                })
+                generator = _quiet_generator(config)
+                path = generator.config["output_file_path"]
+
+                generate_s = _best_of(repeat, generator.generate_workbook)
+                load_s = _best_of(repeat, lambda: load_workbook(path))
+                with zipfile.ZipFile(path) as archive:
+                    xml_bytes = sum(info.file_size for info in archive.infolist())
+                results[f"{writer} {'compact' if compact else 'regular'}"] = {
+                    "generate_ms": generate_s * 1e3,
+                    "load_ms": load_s * 1e3,
+                    "file_bytes": os.path.getsize(path),
+                    "xml_bytes": xml_bytes
+                }
+    return results
+
+
+def bench_parallel(months=120, jobs=None, repeat=3):
+    """
+    Render one long-range workbook in one process and across worker processes
+
+    The parallel timing includes starting the pool, as every run pays for it.
+
+    Returns:
+        dict: Generation time in milliseconds (best of ``repeat``) per job count
+    """
+    jobs = jobs or os.cpu_count() or 1
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for job_count in sorted({1, jobs}):
+            config = _suite_config(months, 20, 0)
+            config.update({
+                "jobs": job_count,
+                "output_file_path": os.path.join(work_dir, "parallel.xlsx"),
+                "metrics": {"enabled": False}
+            })
+            generator = _quiet_generator(config)
+            results[job_count] = {"generate_ms": _best_of(repeat, generator.generate_workbook) * 1e3}
+    return results
+
+
+def _copy_workbooks(work_dir, workbooks, months):
+    """Generate one workbook and copy it ``workbooks - 1`` times; returns the paths"""
+    config = _suite_config(months, 20, 0)
+    config.update({"metrics": {"enabled": False}, "output_file_path": os.path.join(work_dir, "log_00000.xlsx")})
+    _quiet_generator(config).generate_workbook()
+
+    paths = [config["output_file_path"]]
+    with open(paths[0], 'rb') as file:
+        data = file.read()
+    for index in range(1, workbooks):
+        paths.append(os.path.join(work_dir, f"log_{index:05d}.xlsx"))
+        with open(paths[-1], 'wb') as file:
+            file.write(data)
+    return paths
+
+
+def bench_audit(workbooks=200, months=12, jobs=None):
+    """
+    Audit a batch of generated workbooks: opening each in normal mode vs the read-only auditor
+
+    Returns:
+        dict: Workbooks per second per strategy
+    """
+    from openpyxl import load_workbook # type: ignore
+    from workbook_audit import month_sheets, read_month_totals, run_audit
+
+    jobs = jobs or os.cpu_count() or 1
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = _copy_workbooks(work_dir, workbooks, months)
+
+        start = time.perf_counter()
+        for path in paths:
+            for _, ws in month_sheets(load_workbook(path)):
+                read_month_totals(ws)
+        results["normal mode"] = workbooks / (time.perf_counter() - start)
+
+        report_path = os.path.join(work_dir, "report.csv")
+        for job_count in sorted({1, jobs}):
+            summary = run_audit([work_dir], job_count, report_path)
+            results[f"read-only, {job_count} jobs"] = summary["workbooks_per_s"]
+    return results
+
+
+def bench_consolidate(workbooks=1000, changed=20, months=12, jobs=1):
+    """
+    Consolidate a directory of workbooks from scratch, then again after ``changed`` of them were touched
+
+    Returns:
+        dict: Wall time in seconds of the full build and the incremental rebuild
+    """
+    from fleet_report import consolidate
+
+    with tempfile.TemporaryDirectory() as work_dir, tempfile.TemporaryDirectory() as report_dir:
+        paths = _copy_workbooks(work_dir, workbooks, months)
+        index_path = os.path.join(report_dir, "index.json")
+        output_path = os.path.join(report_dir, "fleet.csv")
+
+        start = time.perf_counter()
+        consolidate([work_dir], output_path, index_path, jobs)
+        full_s = time.perf_counter() - start
+
+        for path in paths[:changed]:
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+        start = time.perf_counter()
+        summary = consolidate([work_dir], output_path, index_path, jobs)
+        incremental_s = time.perf_counter() - start
+    return {"full_s": full_s, "incremental_s": incremental_s, "reread": summary["read"]}
+
+
+def _write_trip_log(path, rows, start_date=date(2024, 4, 1), chunk_rows=250000):
+    """Write a synthetic telematics log: back-to-back trips spread over 3 years, a fifth of them personal"""
+    import numpy as np
+    import pandas as pd # type: ignore
+
+    rng = np.random.default_rng(0)
+    start_second = np.datetime64(start_date, "s")
+    mean_gap = max(3 * 365 * 24 * 3600 // rows, 1)
+    seconds, odometer = 0, 17569.0
+    for offset in range(0, rows, chunk_rows):
+        count = min(chunk_rows, rows - offset)
+        second = seconds + np.cumsum(rng.integers(1, 2 * mean_gap, count))
+        distance = np.round(rng.uniform(0.5, 40, count), 1)
+        odometer_end = np.round(odometer + np.cumsum(distance), 1)
+        pd.DataFrame({
+            "vehicle": "DL01AB1234",
+            "timestamp": np.datetime_as_string(start_second + second),
+            "odometer_start": np.round(odometer_end - distance, 1),
+            "odometer_end": odometer_end,
+            "purpose": np.where(rng.random(count) < 0.2, "Personal", "Client visit")
+        }).to_csv(path, mode="a" if offset else "w", header=not offset, index=False)
+        seconds, odometer = second[-1], odometer_end[-1]
+
+
+def _run_trip_log_ingestion(path, chunk_rows):
+    """Aggregate a trip log in a fresh process so peak RSS is its own"""
+    import resource
+    from trip_log import aggregate_trip_log
+
+    start = time.perf_counter()
+    daily = aggregate_trip_log(path, date(2024, 4, 1), date(2027, 3, 31), chunk_rows=chunk_rows)
+    wall = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024  # macOS reports bytes, Linux kilobytes
+    return {"rows": daily.rows_read, "rows_per_s": daily.rows_read / wall, "peak_rss_kb": peak_rss}
+
+
+def bench_trip_log(rows=2000000, chunk_rows=65536):
+    """
+    Trip log ingestion: rows per second and peak RSS for a log of ``rows`` rows and one a quarter its size
+
+    Peak RSS stays flat as the log grows, since only one chunk is held at a time.
+
+    Returns:
+        dict: Results of _run_trip_log_ingestion keyed by log size
+    """
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in (rows // 4, rows):
+            path = os.path.join(work_dir, f"trips_{size}.csv")
+            _write_trip_log(path, size)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[size] = pool.submit(_run_trip_log_ingestion, path, chunk_rows).result()
+            os.remove(path)
+    return results
+
+
+def bench_schedules(months=120, changes=120, repeat=3):
+    """
+    Constant rate and distance vs schedules with ``changes`` changes of each, spread over the range
+
+    Changes fall mid-month, so about as many months are split into segments.
+    Each strategy times building the trip plan, the opening odometer of every
+    month and a whole workbook.
+
+    Returns:
+        dict: Milliseconds per step (best of ``repeat``) per strategy
+    """
+    base = _suite_config(months, 20, 0)
+    start_date = datetime.strptime(base["start_date"], "%Y-%m-%d").date()
+    days = (datetime.strptime(base["end_date"], "%Y-%m-%d").date() - start_date).days
+    change_dates = [(start_date + timedelta(days=(index + 1) * days // (changes + 1))).isoformat()
+                    for index in range(changes)]
+    schedules = {
+        "inr_per_km": {day: 10 + index % 3 for index, day in enumerate(change_dates)},
+        "work_related_km": {day: 90 + 10 * (index % 4) for index, day in enumerate(change_dates)}
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for strategy, config_schedules in (("constant", {}), ("scheduled", schedules)):
+            config = dict(base, schedules=config_schedules, metrics={"enabled": False},
+                          output_file_path=os.path.join(work_dir, f"{strategy}.xlsx"))
+            generator = _quiet_generator(config)
+            months_in_range = generator._month_range()
+
+            def plan():
+                generator._trip_plan = None
+                generator._get_trip_plan()
+
+            def odometers():
+                generator._calendar_index = None
+                for year, month in months_in_range:
+                    generator._month_start_odometer(year, month)
+
+            results[strategy] = {
+                "plan_ms": _best_of(repeat * 10, plan) * 1e3,
+                "odometer_ms": _best_of(repeat * 10, odometers) * 1e3,
+                "generate_ms": _best_of(repeat, generator.generate_workbook) * 1e3
+            }
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=0.2):
+    """
+    Flag metrics that got worse than the baseline by more than ``threshold``
+
+    Returns:
+        list: Human readable regression messages (empty when there are none)
+    """
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for metric in SUITE_METRICS:
+            if previous.get(metric) and current[metric] > previous[metric] * (1 + threshold):
+                change = current[metric] / previous[metric] - 1
+                regressions.append(f"{name}: {metric} {previous[metric]:.6g} -> {current[metric]:.6g} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    """Run a benchmark from the command line"""
+    parser = argparse.ArgumentParser(description='Benchmark fuel log generation.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    headers = subparsers.add_parser('headers', help='Header rendering: from scratch vs pre-rendered template')
+    headers.add_argument('--sheets', type=int, default=500, help='Sheets rendered per run')
+    headers.add_argument('--repeat', type=int, default=3, help='Runs per strategy (best is reported)')
+
+    plan = subparsers.add_parser('plan', help='Vectorised trip plan construction')
+    plan.add_argument('--years', type=int, default=10, help='Years covered by the plan')
+    plan.add_argument('--repeat', type=int, default=5, help='Runs (best is reported)')
+
+    startup = subparsers.add_parser('startup', help='Cold-start latency of the command line tool')
+    startup.add_argument('--runs', type=int, default=5, help='Fresh processes per scenario')
+
+    suite = subparsers.add_parser('suite', help='Full scenario suite with JSON results and regression check')
+    suite.add_argument('--output', '-o', help='Write results to this JSON file')
+    suite.add_argument('--baseline', help='Compare against results previously written with --output')
+    suite.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown/growth before flagging (0.2 = 20%%)')
+    suite.add_argument('--only', help='Comma separated scenario names to run')
+
+    logging_parser = subparsers.add_parser('logging', help='Logging overhead per workbook by log level')
+    logging_parser.add_argument('--workbooks', type=int, default=50, help='One-month workbooks per level')
+
+    writers = subparsers.add_parser('writers', help='Writer backends: throughput and memory on a workbook batch')
+    writers.add_argument('--workbooks', type=int, default=1000, help='Workbooks per writer')
+    writers.add_argument('--months', type=int, default=12, help='Months per workbook')
+
+    styling = subparsers.add_parser('styling', help='Styling throughput: per-attribute assignment vs registered named styles')
+    styling.add_argument('--rows', type=int, default=20000, help='Rows of 11 cells styled per run')
+    styling.add_argument('--repeat', type=int, default=3, help='Runs per strategy (best is reported)')
+
+    compact = subparsers.add_parser('compact', help='Regular vs compact output: file size, generation and load time')
+    compact.add_argument('--months', type=int, default=12, help='Months per workbook')
+    compact.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+
+    parallel = subparsers.add_parser('parallel', help='One long-range workbook: in-process vs parallel month rendering')
+    parallel.add_argument('--months', type=int, default=120, help='Months in the workbook')
+    parallel.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+    parallel.add_argument('--repeat', type=int, default=3, help='Runs per job count (best is reported)')
+
+    audit = subparsers.add_parser('audit', help='Auditing workbooks: normal mode vs read-only streaming in a process pool')
+    audit.add_argument('--workbooks', type=int, default=200, help='Workbooks audited per strategy')
+    audit.add_argument('--months', type=int, default=12, help='Months per workbook')
+    audit.add_argument('--jobs', type=int, help='Worker processes (default: CPU count)')
+
+    consolidate = subparsers.add_parser('consolidate', help='Fleet consolidation: full build vs incremental rebuild')
+    consolidate.add_argument('--workbooks', type=int, default=1000, help='Workbooks in the fleet directory')
+    consolidate.add_argument('--changed', type=int, default=20, help='Workbooks touched before the rebuild')
+    consolidate.add_argument('--months', type=int, default=12, help='Months per workbook')
+    consolidate.add_argument('--jobs', type=int, default=1, help='Worker processes for reading workbooks')
+
+    trip_log = subparsers.add_parser('trip-log', help='Trip log ingestion: rows per second and peak RSS')
+    trip_log.add_argument('--rows', type=int, default=2000000, help='Rows in the larger of the two logs')
+    trip_log.add_argument('--chunk-rows', type=int, default=65536, help='Rows read at a time')
+
+    schedules = subparsers.add_parser('schedules', help='Constant rate and distance vs effective-dated schedules')
+    schedules.add_argument('--months', type=int, default=120, help='Months in the workbook')
+    schedules.add_argument('--changes', type=int, default=120, help='Changes of the rate and of the daily distance each')
+    schedules.add_argument('--repeat', type=int, default=3, help='Runs per workbook (best is reported)')
+
+    service = subparsers.add_parser('service', help='Load test a running generation service')
+    service.add_argument('--url', default='http://127.0.0.1:8080', help='Base URL of the service')
+    service.add_argument('--requests', type=int, default=500, help='Workbooks requested in total')
+    service.add_argument('--concurrency', type=int, default=16, help='Clients posting at the same time')
+    service.add_argument('--months', type=int, default=1, help='Months per requested workbook')
+    service.add_argument('--timeout', type=float, default=60.0, help='Client socket timeout in seconds')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'headers':
+        result = bench_headers(args.sheets, args.repeat)
+        print(f"Rebuild per sheet:  {result['rebuild_us_per_sheet']:.1f} us")
+        print(f"Template per sheet: {result['template_us_per_sheet']:.1f} us")
+        print(f"Saving per sheet:   {result['rebuild_us_per_sheet'] - result['template_us_per_sheet']:.1f} us "
+              f"({result['rebuild_us_per_sheet'] / result['template_us_per_sheet']:.1f}x faster)")
+    elif args.benchmark == 'plan':
+        result = bench_plan(args.years, args.repeat)
+        print(f"Planned {result['days']} days in {result['plan_ms']:.2f} ms")
+    elif args.benchmark == 'startup':
+        for name, timing in bench_startup(args.runs).items():
+            print(f"{name:<10} median {timing['median_ms']:7.1f} ms   min {timing['min_ms']:7.1f} ms")
+    elif args.benchmark == 'logging':
+        results = bench_logging(args.workbooks)
+        for level, per_workbook in results.items():
+            overhead = per_workbook - results["off"]
+            print(f"{level:<6} {per_workbook:7.2f} ms per workbook   overhead {overhead:+6.2f} ms")
+    elif args.benchmark == 'writers':
+        for writer, result in bench_writers(args.workbooks, args.months).items():
+            print(f"{writer:<11}{result['workbooks_per_s']:8.1f} workbooks/s   peak RSS {result['peak_rss_kb'] / 1024:6.1f} MB"
+                  f"   {result['avg_output_bytes'] / 1024:6.1f} KB per workbook")
+    elif args.benchmark == 'styling':
+        result = bench_styling(args.rows, args.repeat)
+        print(f"Per attribute:    {result['per_attribute_cells_per_s']:10.0f} cells/s   "
+              f"{result['per_attribute_cell_xfs']} cell formats saved")
+        print(f"Registered style: {result['registered_cells_per_s']:10.0f} cells/s   "
+              f"{result['registered_cell_xfs']} cell formats saved")
+        print(f"Speed-up: {result['registered_cells_per_s'] / result['per_attribute_cells_per_s']:.1f}x")
+    elif args.benchmark == 'compact':
+        print(f"{'output':<20}{'size KB':>9}{'XML KB':>9}{'generate ms':>13}{'load ms':>9}")
+        for name, result in bench_compact(args.months, args.repeat).items():
+            print(f"{name:<20}{result['file_bytes'] / 1024:>9.1f}{result['xml_bytes'] / 1024:>9.1f}"
+                  f"{result['generate_ms']:>13.1f}{result['load_ms']:>9.1f}")
+    elif args.benchmark == 'parallel':
+        results = bench_parallel(args.months, args.jobs, args.repeat)
+        serial_ms = results[1]["generate_ms"]
+        for job_count, result in results.items():
+            print(f"{job_count:>3} jobs {result['generate_ms']:9.1f} ms   {serial_ms / result['generate_ms']:5.2f}x")
+    elif args.benchmark == 'audit':
+        for strategy, workbooks_per_s in bench_audit(args.workbooks, args.months, args.jobs).items():
+            print(f"{strategy:<20}{workbooks_per_s:8.1f} workbooks/s")
+    elif args.benchmark == 'consolidate':
+        result = bench_consolidate(args.workbooks, args.changed, args.months, args.jobs)
+        print(f"Full build:          {result['full_s']:7.2f} s")
+        print(f"After {args.changed} changes: {result['incremental_s']:7.2f} s   ({result['reread']} workbooks re-read)")
+    elif args.benchmark == 'trip-log':
+        for size, result in bench_trip_log(args.rows, args.chunk_rows).items():
+            print(f"{size:>10} rows {result['rows_per_s']:12.0f} rows/s   peak RSS {result['peak_rss_kb'] / 1024:6.1f} MB")
+    elif args.benchmark == 'schedules':
+        print(f"{'strategy':<12}{'plan ms':>9}{'odometer ms':>13}{'generate ms':>13}")
+        for strategy, result in bench_schedules(args.months, args.changes, args.repeat).items():
+            print(f"{strategy:<12}{result['plan_ms']:>9.2f}{result['odometer_ms']:>13.2f}{result['generate_ms']:>13.1f}")
+    elif args.benchmark == 'service':
+        result = bench_service(args.url, args.requests, args.concurrency, args.months, args.timeout)
+        latency = result["latency_ms"]
+        print(f"{result['workbooks_per_s']:.1f} workbooks/s over {result['wall_s']:.2f}s, "
+              f"{result['avg_response_bytes'] / 1024:.1f} KB per workbook")
+        print(f"Latency p50 {latency['p50']:.1f} ms   p95 {latency['p95']:.1f} ms   p99 {latency['p99']:.1f} ms")
+        print("Statuses: " + ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items())))
+        service_latency = result["service"]["latency_ms"]
+        print(f"Service render p50 {service_latency['p50']} ms   p95 {service_latency['p95']} ms   "
+              f"rejected {result['service']['rejected']}   timed out {result['service']['timed_out']}")
+    elif args.benchmark == 'suite':
+        results = run_suite(args.only.split(",") if args.only else None)
+
+        print(f"{'scenario':<14}{'wall s':>9}{'odometer':>9}{'header':>9}{'data':>9}{'widths':>9}{'save':>9}"
+              f"{'RSS MB':>9}{'size KB':>10}")
+        for name, result in results["scenarios"].items():
+            phases = result["phases_s"]
+            print(f"{name:<14}{result['wall_s']:>9.2f}{phases['odometer']:>9.2f}{phases['header']:>9.2f}{phases['data']:>9.2f}"
+                  f"{phases['column_widths']:>9.2f}{phases['save']:>9.2f}{result['peak_rss_kb'] / 1024:>9.1f}"
+                  f"{result['output_bytes'] / 1024:>10.1f}")
+
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(results, file, indent=2)
+
+        if args.baseline:
+            with open(args.baseline, 'r') as file:
+                regressions = compare_to_baseline(results, json.load(file), args.threshold)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
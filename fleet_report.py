@@ -0,0 +1,223 @@
+"""
+Fleet consolidation: month totals of every log book in a set of directories in one summary
+
+The opening and closing odometer (``H7``/``H8``), monthly distance (``I7``) and
+amount (the K total) of each month sheet are read in openpyxl's read-only mode.
+They are kept in a persistent index keyed on each workbook's path, modification
+time and size, so a re-run only reads the workbooks that were added or changed
+since the last one.
+"""
+import csv
+import json
+import logging
+import os
+import time
+
+# Index kept next to the output cache by default
+DEFAULT_INDEX_PATH = os.path.join(".fuel_log_cache", "fleet_index.json")
+
+# Bump whenever the indexed values change, so older indexes are rebuilt
+INDEX_VERSION = 1
+
+SUMMARY_FIELDS = (
+    "employee_id", "employee_name", "month", "opening_odometer", "closing_odometer", "km", "amount", "workbook"
+)
+
+
+def extract_workbook(path):
+    """
+    Month totals of one log book
+
+    Returns:
+        dict: ``employee_id``, ``employee_name`` and ``months`` as
+            [YYYY-MM, opening, closing, km, amount] lists in month order, or an
+            ``error`` message when the workbook can't be read
+    """
+    from openpyxl import load_workbook # type: ignore
+    from workbook_audit import month_sheets, read_month_totals
+
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        return {"error": str(e)}
+
+    entry = {"employee_id": None, "employee_name": None, "months": []}
+    try:
+        for month, ws in month_sheets(workbook):
+            totals = read_month_totals(ws)
+            if totals["opening"] is None or totals["closing"] is None or totals["distance"] is None:
+                continue  # Not laid out like a generated month sheet
+            if entry["employee_id"] is None:
+                entry["employee_id"], entry["employee_name"] = totals["employee_id"], totals["employee_name"]
+
+            # H8 is 0 for a month without workdays, in which case the opening reading still holds
+            closing = totals["closing"] or totals["opening"]
+            km = totals["distance"] if totals["closing"] else 0
+            entry["months"].append([month.strftime("%Y-%m"), totals["opening"], closing, km, totals["total"] or 0])
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        workbook.close()
+    return entry
+
+
+class FleetIndex:
+    """
+    Extracted month totals per workbook, persisted as one JSON file
+
+    Entries are keyed on the absolute path and hold the modification time and
+    size the workbook had when it was read, so a changed workbook is noticed
+    without opening it. The file is replaced through a temporary file and
+    ``os.replace``, so an interrupted run leaves the previous index intact.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data["workbooks"]
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass  # Missing, unreadable or outdated: start from scratch
+
+    def lookup(self, path, stat):
+        """The entry of a workbook if it hasn't changed since it was indexed, else None"""
+        entry = self.entries.get(path)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            return None
+        return entry
+
+    def store(self, path, stat, entry):
+        self.entries[path] = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+    def prune(self, paths):
+        """Drop the entries of workbooks not in ``paths``; returns how many were dropped"""
+        removed = self.entries.keys() - set(paths)
+        for path in removed:
+            del self.entries[path]
+        return len(removed)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump({"version": INDEX_VERSION, "workbooks": self.entries}, file, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+
+def summary_rows(index, paths):
+    """Summary rows of the indexed workbooks, ordered by employee, month and workbook"""
+    rows = []
+    for path in paths:
+        entry = index.entries[path]
+        for month, opening, closing, km, amount in entry.get("months", ()):
+            rows.append((entry["employee_id"], entry["employee_name"], month, opening, closing, km, amount, path))
+    rows.sort(key=lambda row: (str(row[0]), row[2], row[7]))
+    return rows
+
+
+def write_summary(rows, output_path):
+    """Write summary rows to a CSV file, or a workbook when the path ends in ``.xlsx``"""
+    if not output_path.lower().endswith(".xlsx"):
+        with open(output_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(SUMMARY_FIELDS)
+            writer.writerows(rows)
+        return
+
+    import openpyxl # type: ignore
+    from openpyxl.cell import WriteOnlyCell # type: ignore
+    from openpyxl.styles import Font # type: ignore
+
+    workbook = openpyxl.Workbook(write_only=True)
+    ws = workbook.create_sheet(title="Fleet")
+    for col_letter, width in zip("ABCDEFGH", (14, 24, 10, 18, 18, 12, 14, 60)):
+        ws.column_dimensions[col_letter].width = width
+    ws.freeze_panes = "A2"
+
+    header = []
+    for field in SUMMARY_FIELDS:
+        cell = WriteOnlyCell(ws, value=field.replace("_", " ").title())
+        cell.font = Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    workbook.save(output_path)
+
+
+def consolidate(paths, output_path, index_path=DEFAULT_INDEX_PATH, jobs=1):
+    """
+    Summarize the month totals of every log book found in ``paths``
+
+    Only workbooks that are new or whose modification time or size changed are
+    read; the others come from the index. Workbooks that can't be read are
+    logged and left out of the summary until they change.
+
+    Args:
+        paths (list): Workbook files and directories to search for ``.xlsx`` files
+        output_path (str): Summary file: a workbook for ``.xlsx``, otherwise CSV
+        index_path (str): Persistent index file
+        jobs (int): Number of worker processes for reading changed workbooks
+
+    Returns:
+        dict: Counts of ``workbooks`` found, ``read``, ``reused`` from the index,
+            ``removed`` from it, ``failed`` and summary ``rows``
+    """
+    from workbook_audit import find_workbooks
+
+    logger = logging.getLogger('FuelLogGenerator')
+    start = time.perf_counter()
+
+    # Skip the summary itself when it is written into a scanned directory
+    output = os.path.abspath(output_path)
+    workbooks = [path for path in map(os.path.abspath, find_workbooks(paths)) if path != output]
+
+    index = FleetIndex(index_path)
+    summary = {"workbooks": len(workbooks), "read": 0, "reused": 0, "removed": index.prune(workbooks),
+               "failed": 0, "rows": 0}
+
+    changed = []
+    for path in workbooks:
+        stat = os.stat(path)
+        if index.lookup(path, stat) is None:
+            changed.append((path, stat))
+        else:
+            summary["reused"] += 1
+
+    if jobs <= 1 or len(changed) <= 1:
+        entries = map(extract_workbook, [path for path, _ in changed])
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        entries = executor.map(extract_workbook, [path for path, _ in changed],
+                               chunksize=max(1, min(64, len(changed) // (jobs * 8))))
+    try:
+        for (path, stat), entry in zip(changed, entries):
+            index.store(path, stat, entry)
+            summary["read"] += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    index.save()
+
+    for path in workbooks:
+        error = index.entries[path].get("error")
+        if error is not None:
+            logger.error(f"Could not read {path}: {error}")
+            summary["failed"] += 1
+
+    rows = summary_rows(index, workbooks)
+    write_summary(rows, output_path)
+    summary["rows"] = len(rows)
+
+    logger.info(f"Consolidated {summary['rows']} months of {summary['workbooks']} workbooks into {output_path} "
+                f"in {time.perf_counter() - start:.2f}s: {summary['read']} read, {summary['reused']} unchanged, "
+                f"{summary['removed']} removed, {summary['failed']} unreadable")
+    return summary
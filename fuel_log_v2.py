@@ -1,12 +1,191 @@
-import openpyxl # type: ignore
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment # type: ignore
-from openpyxl.utils import get_column_letter # type: ignore
+# openpyxl, NumPy and the process pool are imported where they are first used,
+# so --help, argument errors and roster parsing don't pay for loading them
+from contextlib import nullcontext
+from copy import copy, deepcopy
 from datetime import datetime, timedelta
-import pandas as pd # type: ignore
+import hashlib
 import os
 import argparse
+import csv
 import json
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import atexit
+
+# Default configuration, overridden by JSON config files, CLI arguments and roster records
+DEFAULT_CONFIG = {
+    "start_date": datetime(2024, 8, 1),
+    "end_date": datetime(2025, 3, 31),
+    "initial_odometer": 17569,
+    "inr_per_km": 10,
+    "work_related_km": 110,
+    "schedules": {
+        "inr_per_km": {},
+        "work_related_km": {}
+    },
+    "trip_purpose": "Official",
+    "client_name": "Blink Charging",
+    "is_work_travel": "Y",
+    "personal_travel": "",
+    "trip_log": {
+        "path": None,
+        "columns": {},
+        "personal_purposes": ["personal"],
+        "chunk_rows": 65536
+    },
+    "holidays": ['2025-01-26', '2025-03-10'],
+    "holiday_calendar": None,
+    "calendar_dir": None,
+    "employee": {
+        "name": "Ashish Kumar",
+        "id": "BLINKIN065",
+        "department": "Technology",
+        "manager": "Ajay Singh"
+    },
+    "vehicle": {
+        "make": "Hyundai",
+        "model": "Xcent",
+        "year": "2018",
+        "registration": "Delhi",
+        "engine_size": "1199 CC"
+    },
+    "output_file_path": "Financial_Year_2024_25_Log_Book.xlsx",
+    "writer": "openpyxl",
+    "streaming": False,
+    "compact": False,
+    "jobs": 1,
+    "append": False,
+    "metrics": {
+        "enabled": False,
+        "path": None,
+        "format": "jsonl"
+    },
+    "export": {
+        "path": None,
+        "format": "csv"
+    },
+    "archive": {
+        "path": None,
+        "format": "zip"
+    },
+    "cache": {
+        "enabled": False,
+        "dir": ".fuel_log_cache",
+        "max_mb": 512,
+        "max_age_days": 30
+    }
+}
+
+# Part of every cache key; bump it whenever the rendered layout changes
+GENERATOR_VERSION = "2.3"
+
+# Settings that change how or where a workbook is written, but not its contents
+_CACHE_NEUTRAL_KEYS = ("output_file_path", "calendar_dir", "streaming", "jobs", "append", "metrics", "export", "archive", "cache")
+
+# Settings rendered into every month sheet besides the trip plan itself
+_SHEET_CONFIG_KEYS = ("employee", "vehicle", "trip_purpose", "client_name", "is_work_travel", "personal_travel", "compact")
+
+# Stand-in for GenerationMetrics.phase when metrics are disabled
+_NO_METRICS = nullcontext()
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# --log-level choices; "quiet" logs like "info" but drops per-holiday and per-sheet messages
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "quiet": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR
+}
+
+# Per-holiday and per-sheet messages go to this child logger so quiet mode can drop them
+DETAIL_LOGGER = 'FuelLogGenerator.detail'
+
+# Background thread writing queued log records, set up once by configure_logging
+_log_listener = None
+
+
+def configure_logging(level="info", log_file='fuel_log_generator.log'):
+    """
+    Configure logging for the process; later calls are ignored
+    
+    Log calls only put records on an in-memory queue. A background listener
+    thread formats them and writes them to the console and log file, so
+    generation never blocks on disk I/O.
+    
+    Args:
+        level (str): One of LOG_LEVELS
+        log_file (str): Log file path, or None for console only
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(LOG_LEVELS[level])
+    logging.getLogger(DETAIL_LOGGER).setLevel(logging.WARNING if level == "quiet" else logging.NOTSET)
+    
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+
+def _init_worker_logging(log_queue, level, detail_level):
+    """Process pool initializer: send worker log records to the parent's listener"""
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)] if log_queue is not None else []
+    root.setLevel(level)
+    logging.getLogger(DETAIL_LOGGER).setLevel(detail_level)
+
+
+def _start_worker_log_forwarder(context):
+    """
+    Forward log records from pool workers to this process's listener
+    
+    Args:
+        context: multiprocessing context the pool is created with
+    
+    Returns:
+        tuple: Arguments for _init_worker_logging and the forwarding listener to
+            stop once the pool is done (None when logging isn't configured)
+    """
+    log_queue = None
+    forwarder = None
+    if _log_listener is not None:
+        log_queue = context.Queue()
+        forwarder = QueueListener(log_queue, *_log_listener.handlers)
+        forwarder.start()
+    
+    worker_logging = (log_queue, logging.getLogger().level, logging.getLogger(DETAIL_LOGGER).level)
+    return worker_logging, forwarder
+
+
+def _deep_update(source, updates):
+    """Recursively merge ``updates`` into ``source``, replacing non-dict values"""
+    for key, value in updates.items():
+        if isinstance(value, dict) and key in source and isinstance(source[key], dict):
+            _deep_update(source[key], value)
+        else:
+            source[key] = value
+
+
+def _hash_canonical(data):
+    """SHA-256 of a JSON rendering with sorted keys, so equal configs always hash alike"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
 
 class FuelLogGenerator:
     """Class to generate fuel log workbooks for expense tracking"""
@@ -18,91 +197,109 @@ class FuelLogGenerator:
         Args:
             config (dict): Configuration dictionary with settings
         """
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('fuel_log_generator.log')
-            ]
-        )
+        # Logging is configured once by the entry point, see configure_logging
         self.logger = logging.getLogger('FuelLogGenerator')
+        self.detail_logger = logging.getLogger(DETAIL_LOGGER)
         
         # Load default config
-        self.config = {
-            "start_date": datetime(2024, 8, 1),
-            "end_date": datetime(2025, 3, 31),
-            "initial_odometer": 17569,
-            "inr_per_km": 10,
-            "work_related_km": 110,
-            "trip_purpose": "Official",
-            "client_name": "Blink Charging",
-            "is_work_travel": "Y",
-            "personal_travel": "",
-            "holidays": ['2025-01-26', '2025-03-10'],
-            "employee": {
-                "name": "Ashish Kumar",
-                "id": "BLINKIN065",
-                "department": "Technology",
-                "manager": "Ajay Singh"
-            },
-            "vehicle": {
-                "make": "Hyundai",
-                "model": "Xcent",
-                "year": "2018",
-                "registration": "Delhi",
-                "engine_size": "1199 CC"
-            },
-            "output_file_path": "Financial_Year_2024_25_Log_Book.xlsx"
-        }
+        self.config = deepcopy(DEFAULT_CONFIG)
         
         # Override with provided config
         if config:
             self._update_config(config)
             
         # Initialize workbook
-        self.workbook = openpyxl.Workbook()
-        self.workbook.remove(self.workbook.active)  # Remove the default sheet
+        self.workbook = self._create_workbook()
         
         # Define styles
         self._define_styles()
         
-        # Process holidays into datetime objects
+        # Resolve the holiday calendar and extra holiday dates
         self._process_holidays()
         
+        # Workday calendar, trip plan and header template are built lazily, once per effective config
+        self._calendar_index = None
+        self._trip_plan = None
+        self._header_template = None
+        
+        # Longest value written to each column of the sheet being built
+        self._column_lengths = {}
+        
+        # Named styles registered with the current openpyxl workbook, as (workbook, {name: StyleArray})
+        self._style_arrays = None
+        
+        # GenerationMetrics for the current run, when enabled in the config
+        self.metrics = None
+        
+    def reset(self, config=None):
+        """
+        Replace the configuration with the defaults plus ``config``
+        
+        Styles defined at construction are kept, so a long-lived generator can
+        render many configs without paying the setup cost again.
+        """
+        self.config = deepcopy(DEFAULT_CONFIG)
+        self._update_config(config or {})
+        self._process_holidays()
+    
     def _update_config(self, config):
         """Update configuration with provided values"""
-        def deep_update(source, updates):
-            for key, value in updates.items():
-                if isinstance(value, dict) and key in source and isinstance(source[key], dict):
-                    deep_update(source[key], value)
-                else:
-                    source[key] = value
-        
-        deep_update(self.config, config)
+        _deep_update(self.config, config)
         
         # Convert string dates to datetime if needed
         if isinstance(self.config["start_date"], str):
             self.config["start_date"] = datetime.strptime(self.config["start_date"], "%Y-%m-%d")
         if isinstance(self.config["end_date"], str):
             self.config["end_date"] = datetime.strptime(self.config["end_date"], "%Y-%m-%d")
+        
+        # Dates, holidays or employee details may have changed, so cached layouts are stale
+        self.holidays = None
+        self._calendar_index = None
+        self._trip_plan = None
+        self._header_template = None
+    
+    def _create_workbook(self, write_only=None):
+        """Create an empty workbook, write-only when streaming is enabled unless ``write_only`` says otherwise"""
+        import openpyxl # type: ignore
+        
+        if write_only is None:
+            write_only = self.config["streaming"]
+        if write_only:
+            return openpyxl.Workbook(write_only=True)
+        
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)  # Remove the default sheet
+        return workbook
     
     def _process_holidays(self):
-        """Process holidays from strings to datetime objects"""
-        processed_holidays = []
-        for holiday_str in self.config["holidays"]:
-            try:
-                holiday_date = datetime.strptime(holiday_str, "%Y-%m-%d")
-                processed_holidays.append(holiday_date)
-                self.logger.info(f"Added holiday: {holiday_date.strftime('%Y-%m-%d')}")
-            except ValueError:
-                self.logger.error(f"Invalid holiday date format: {holiday_str}")
+        """
+        Resolve the effective holidays: the named holiday calendar plus the extra dates in ``holidays``
+        
+        The result is shared through holiday_calendars, so generators with the same
+        calendar and extra dates parse them once per process and share one frozen set.
+        """
+        from holiday_calendars import resolve_holidays
         
-        self.config["holidays"] = processed_holidays
+        self.holidays, invalid = resolve_holidays(
+            self.config["holiday_calendar"], self.config["holidays"], self.config["calendar_dir"]
+        )
+        for holiday_str in invalid:
+            self.logger.error(f"Invalid holiday date format: {holiday_str}")
+        self.detail_logger.info(
+            "Holidays: %d dates (calendar: %s, %d extra)",
+            len(self.holidays), self.config["holiday_calendar"] or "none", len(self.config["holidays"]) - len(invalid)
+        )
+    
+    def _get_holidays(self):
+        """Return the effective holiday dates, resolving them again after a config update"""
+        if self.holidays is None:
+            self._process_holidays()
+        return self.holidays
     
     def _define_styles(self):
         """Define common styles used in the workbook"""
+        from openpyxl.styles import Font, PatternFill, Border, Side, Alignment # type: ignore
+        
         # Font styles
         self.font_title = Font(size=18, bold=True, name="Algerian")
         self.font_heading = Font(size=12, bold=True, underline="single")
@@ -127,122 +324,263 @@ class FuelLogGenerator:
         self.align_center = Alignment(horizontal="center", vertical="center", wrap_text=True)
         self.align_right = Alignment(horizontal="right", vertical="center", wrap_text=True)
         self.align_left = Alignment(horizontal="left", vertical="center", wrap_text=True)
+        
+        # Named cell styles, as the style attributes each one sets
+        self.cell_styles = {
+            "title": {"font": self.font_title, "fill": self.fill_header, "border": self.border_all, "alignment": self.align_center},
+            "section_heading": {"font": self.font_heading, "alignment": self.align_center},
+            "label": {"font": self.font_subheading, "alignment": self.align_right},
+            "value": {"alignment": self.align_left, "border": self.border_all},
+            "spacer": {"border": self.border_right},
+            "header": {"font": self.font_subheading, "fill": self.fill_header, "border": self.border_all, "alignment": self.align_center},
+            "data": {"border": self.border_all},
+            "weekend": {"border": self.border_all, "font": self.font_weekend},
+            "holiday": {"border": self.border_all, "font": self.font_holiday, "fill": self.fill_holiday}
+        }
 
-    def _apply_cell_style(self, ws, cell_ref, value, style_type):
-        """Apply pre-defined styles to cells"""
-        cell = ws[cell_ref]
-        cell.value = value
-        
-        if style_type == "title":
-            cell.font = self.font_title
-            cell.fill = self.fill_header
-            cell.border = self.border_all
-            cell.alignment = self.align_center
-        elif style_type == "section_heading":
-            cell.font = self.font_heading
-            cell.alignment = self.align_center
-        elif style_type == "label":
-            cell.font = self.font_subheading
-            cell.alignment = self.align_right
-        elif style_type == "value":
-            cell.alignment = self.align_left
-            cell.border = self.border_all
-        elif style_type == "spacer":
-            cell.border = self.border_right
-        elif style_type == "header":
-            cell.font = self.font_subheading
-            cell.fill = self.fill_header
-            cell.border = self.border_all
-            cell.alignment = self.align_center
+    def _get_style_arrays(self):
+        """Named styles registered with the current workbook, shared by all of its sheets"""
+        if self._style_arrays is None or self._style_arrays[0] is not self.workbook:
+            self._style_arrays = (self.workbook, {})
+        return self._style_arrays[1]
+    
+    def _apply_cell_style(self, writer, cell_ref, value, style_type):
+        """Write a value to a cell with one of the named cell styles"""
+        from sheet_writers import cell_position
+        
+        row, column = cell_position(cell_ref)
+        writer.write(row, column, value, style_type)
+        
+    def _scheduled(self, key):
+        """The configured ``inr_per_km`` or ``work_related_km``, as a Schedule when it has effective-dated changes"""
+        from schedules import resolve_schedule
+        
+        schedules = self.config["schedules"]
+        if not isinstance(schedules, dict):
+            raise ValueError(f"Invalid schedules, expected a mapping of setting names to schedules: {schedules!r}")
+        return resolve_schedule(key, self.config[key], schedules.get(key))
+    
+    def _build_calendar_index(self):
+        """
+        Precompute work-related kilometres for every month in the configured range
+        
+        Returns:
+            dict: Hashed holiday dates and a prefix sum of kilometres, where
+                ``km_before[i]`` is the work-related distance driven in the months
+                preceding the i-th month of the range
+        """
+        from trip_plan import month_work_km
+        
+        holiday_dates = self._get_holidays()
+        work_related_km = self._scheduled("work_related_km")
+        
+        start_date = self.config["start_date"]
+        end_date = self.config["end_date"]
+        month_count = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
+        
+        # Workday counts are memoized per (holidays, year, month) and shared across generators;
+        # a km schedule is split into per-month segments at its change dates
+        km_before = [0]
+        for m_idx in range(max(month_count, 0)):
+            m_year = start_date.year + (start_date.month + m_idx - 1) // 12
+            m_month = (start_date.month + m_idx - 1) % 12 + 1
+            km_before.append(km_before[-1] + month_work_km(holiday_dates, m_year, m_month, work_related_km))
+        
+        return {"holidays": holiday_dates, "km_before": km_before}
+    
+    def _get_calendar_index(self):
+        """Return the workday calendar, building it on first use"""
+        if self._calendar_index is None:
+            self._calendar_index = self._build_calendar_index()
+        return self._calendar_index
+    
+    def _month_start_odometer(self, year, month):
+        """Odometer reading on the 1st of the given month"""
+        if self.config["trip_log"]["path"]:
+            # Logged readings don't follow from the workday count
+            return self._get_trip_plan().month(year, month).odometer_start[0].item()
         
+        month_index = (year - self.config["start_date"].year) * 12 + (month - self.config["start_date"].month)
+        return self.config["initial_odometer"] + self._get_calendar_index()["km_before"][month_index]
+    
+    def _get_trip_plan(self):
+        """Return the day-by-day trip plan for the configured range, building it on first use"""
+        if self._trip_plan is None and self.config["trip_log"]["path"]:
+            self._trip_plan = self._build_trip_plan_from_log()
+        elif self._trip_plan is None:
+            from trip_plan import build_trip_plan
+            
+            self._trip_plan = build_trip_plan(
+                self.config["start_date"],
+                self.config["end_date"],
+                self.config["initial_odometer"],
+                self._scheduled("work_related_km"),
+                self._scheduled("inr_per_km"),
+                self._get_calendar_index()["holidays"]
+            )
+        return self._trip_plan
+    
+    def _build_trip_plan_from_log(self):
+        """Aggregate the configured trip log per day and plan the range from it"""
+        import time
+        from trip_log import aggregate_trip_log
+        from trip_plan import build_trip_plan_from_log
+        
+        log_config = self.config["trip_log"]
+        start = time.perf_counter()
+        daily = aggregate_trip_log(
+            log_config["path"],
+            self.config["start_date"],
+            self.config["end_date"],
+            log_config["columns"],
+            log_config["personal_purposes"],
+            log_config["chunk_rows"]
+        )
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"Aggregated {daily.rows_read - daily.rows_skipped} trips from {log_config['path']} "
+                         f"in {elapsed:.2f}s ({daily.rows_read / elapsed if elapsed > 0 else 0:.0f} rows/s), "
+                         f"skipped {daily.rows_skipped} rows outside the range or unreadable")
+        
+        return build_trip_plan_from_log(
+            self.config["start_date"],
+            self.config["end_date"],
+            self.config["initial_odometer"],
+            daily,
+            self._scheduled("inr_per_km"),
+            self._get_calendar_index()["holidays"]
+        )
+    
     def _create_month_sheet(self, year, month):
         """Create a worksheet for a given month"""
+        from sheet_writers import OpenpyxlSheetWriter
+        
         month_date = datetime(year, month, 1)
         sheet_name = month_date.strftime("%b%y")
-        self.logger.info(f"Creating sheet for {sheet_name}")
+        self.detail_logger.info("Creating sheet for %s", sheet_name)
         
-        ws = self.workbook.create_sheet(title=sheet_name)
+        if self.metrics is not None:
+            self.metrics.start_sheet(sheet_name)
         
-        # Generate the date range for the month
-        first_day = month_date
-        last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        date_range = pd.date_range(start=first_day, end=last_day)
-        
-        # Calculate starting odometer for this month
-        current_month_index = (year - self.config["start_date"].year) * 12 + (month - self.config["start_date"].month)
-        
-        if current_month_index == 0:
-            odometer_start = self.config["initial_odometer"]
+        if self.config["writer"] == "xlsxwriter":
+            # Buffers the month and writes it out in row order when closed
+            writer = self.workbook.add_sheet(sheet_name)
+        elif self.workbook.write_only:
+            from openpyxl.worksheet.worksheet import Worksheet # type: ignore
+            
+            # Build the month in a detached buffer sheet sharing the workbook's
+            # style tables; it is streamed out once complete
+            writer = OpenpyxlSheetWriter(Worksheet(self.workbook, title=sheet_name), self.cell_styles, self._get_style_arrays())
         else:
-            # Calculate based on previous months
-            odometer_start = self.config["initial_odometer"]
-            for m_idx in range(current_month_index):
-                m_year = self.config["start_date"].year + (self.config["start_date"].month + m_idx - 1) // 12
-                m_month = (self.config["start_date"].month + m_idx - 1) % 12 + 1
-                m_first_day = datetime(m_year, m_month, 1)
-                m_last_day = (m_first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-                m_date_range = pd.date_range(start=m_first_day, end=m_last_day)
-                
-                # Count only workdays (not weekends or holidays)
-                workday_count = 0
-                for d in m_date_range:
-                    if d.weekday() < 5 and not any(d.date() == h.date() for h in self.config["holidays"]):
-                        workday_count += 1
-                
-                odometer_start += workday_count * self.config["work_related_km"]
+            writer = OpenpyxlSheetWriter(self.workbook.create_sheet(title=sheet_name), self.cell_styles, self._get_style_arrays())
+        
+        with self._phase("odometer"):
+            # Planned days for the month
+            month_plan = self._get_trip_plan().month(year, month)
+            
+            # Calculate starting odometer for this month
+            odometer_start = self._month_start_odometer(year, month)
         
         # Add headers and basic info
-        self._add_sheet_headers(ws, year, month, odometer_start)
+        with self._phase("header"):
+            self._add_sheet_headers(writer, year, month, odometer_start)
         
         # Fill in the data
-        self._add_sheet_data(ws, date_range, odometer_start)
+        with self._phase("data"):
+            self._add_sheet_data(writer, month_plan)
         
         # Auto-adjust column widths
-        self._adjust_column_widths(ws)
+        with self._phase("column_widths"):
+            self._adjust_column_widths(writer)
+        
+        if self.metrics is not None:
+            self.metrics.count_cells(*writer.cell_counts())
+        
+        if self.config["writer"] == "xlsxwriter":
+            with self._phase("stream"):
+                ws = writer.close()
+        elif self.workbook.write_only:
+            with self._phase("stream"):
+                ws = self._stream_sheet(writer.ws)
+        else:
+            ws = writer.ws
+        
+        if self.metrics is not None:
+            self.metrics.end_sheet()
+        
+        return ws
+    
+    def _phase(self, name):
+        """Context manager timing a generation phase; a no-op unless metrics are enabled"""
+        if self.metrics is None:
+            return _NO_METRICS
+        return self.metrics.phase(name)
+    
+    def _stream_sheet(self, buffer):
+        """Write a finished buffer sheet into the write-only workbook in row order"""
+        from openpyxl.cell import WriteOnlyCell # type: ignore
+        
+        ws = self.workbook.create_sheet(title=buffer.title)
+        
+        # Column widths and merged ranges must be declared before the first row
+        for col_letter, dimension in buffer.column_dimensions.items():
+            ws.column_dimensions[col_letter].width = dimension.width
+        for merged_range in buffer.merged_cells.ranges:
+            ws.merged_cells.add(merged_range.coord)
+        
+        for row in buffer.iter_rows():
+            stream_row = []
+            for cell in row:
+                stream_cell = WriteOnlyCell(ws, value=cell.value)
+                if cell.has_style:
+                    stream_cell._style = copy(cell._style)
+                stream_row.append(stream_cell)
+            ws.append(stream_row)
         
+        # Flush the sheet to its temporary file so only one month is held in memory
+        ws.close()
         return ws
     
-    def _add_sheet_headers(self, ws, year, month, odometer_start):
+    def _add_sheet_headers(self, writer, year, month, odometer_start):
         """Add headers and basic info to the worksheet"""
-        # Company header
-        self._apply_cell_style(ws, "A1", "Blink Charging Software Solutions India Private Limited", "title")
-        ws.merge_cells(start_row=1, start_column=1, end_row=2, end_column=11)
+        from sheet_writers import cell_position
         
-        # Basic details section
-        self._apply_cell_style(ws, "A3", "BASIC DETAILS", "section_heading")
-        ws.merge_cells(start_row=3, start_column=1, end_row=3, end_column=2)
-        
-        self._apply_cell_style(ws, "A5", "Name:", "label")
-        self._apply_cell_style(ws, "B5", self.config["employee"]["name"], "value")
-        self._apply_cell_style(ws, "A6", "Employee ID:", "label")
-        self._apply_cell_style(ws, "B6", self.config["employee"]["id"], "value")
-        self._apply_cell_style(ws, "A7", "Department:", "label")
-        self._apply_cell_style(ws, "B7", self.config["employee"]["department"], "value")
-        self._apply_cell_style(ws, "A8", "Manager:", "label")
-        self._apply_cell_style(ws, "B8", self.config["employee"]["manager"], "value")
+        if self._header_template is None:
+            self._header_template = self._build_header_template(year, month, odometer_start)
         
-        # Vehicle details section
-        self._apply_cell_style(ws, "D3", "VEHICLE DETAILS", "section_heading")
-        ws.merge_cells(start_row=3, start_column=4, end_row=3, end_column=5)
-        
-        self._apply_cell_style(ws, "D4", "Make:", "label")
-        self._apply_cell_style(ws, "E4", self.config["vehicle"]["make"], "value")
-        self._apply_cell_style(ws, "D5", "Model:", "label")
-        self._apply_cell_style(ws, "E5", self.config["vehicle"]["model"], "value")
-        self._apply_cell_style(ws, "D6", "Year:", "label")
-        self._apply_cell_style(ws, "E6", self.config["vehicle"]["year"], "value")
-        self._apply_cell_style(ws, "D7", "Registration:", "label")
-        self._apply_cell_style(ws, "E7", self.config["vehicle"]["registration"], "value")
-        self._apply_cell_style(ws, "D8", "Engine Size:", "label")
-        self._apply_cell_style(ws, "E8", self.config["vehicle"]["engine_size"], "value")
+        writer.stamp(self._header_template)
+        self._column_lengths = dict(self._header_template["lengths"])
         
-        # Odometer reading section
-        self._apply_cell_style(ws, "G3", "ODOMETER READING", "section_heading")
-        ws.merge_cells(start_row=3, start_column=7, end_row=3, end_column=8)
+        # Patch the month-specific cells, keeping the template's styles
+        for cell_ref, value in self._month_header_values(year, month, odometer_start).items():
+            writer.write(*cell_position(cell_ref), value)
+            self._track_width(cell_ref[0], value)
+    
+    def _build_header_template(self, year, month, odometer_start):
+        """
+        Render the header block once and record it for stamping into every sheet
+        
+        Returns:
+            dict: ``cells`` as (row, column, value, style) tuples, ``merged``
+                ranges and the column ``lengths`` of the month-independent values
+        """
+        from sheet_writers import RecordingSheetWriter, cell_position
+        
+        recorder = RecordingSheetWriter()
+        self._render_header_block(recorder, year, month, odometer_start)
+        template = recorder.template()
         
-        self._apply_cell_style(ws, "G6", "Financial year:", "label")
-        self._apply_cell_style(ws, "H6", f"{year}-{str(year+1)[-2:]}", "value")
+        # Month-specific cells are tracked when they are patched in
+        month_cells = {cell_position(cell_ref) for cell_ref in self._month_header_values(year, month, odometer_start)}
+        self._column_lengths = {}
+        for row, column, value, _ in template["cells"]:
+            if (row, column) not in month_cells:
+                self._track_width(chr(64 + column), value)
         
+        template["lengths"] = self._column_lengths
+        return template
+    
+    def _month_header_values(self, year, month, odometer_start):
+        """Header cell values that change from month to month"""
         # Month details for odometer
         month_name = datetime(year, month, 1).strftime("%B")
         last_date = datetime(year, month, 1).replace(day=28) + timedelta(days=4)
@@ -255,16 +593,67 @@ class FuelLogGenerator:
             last_date_suffix = "nd"
         elif last_date == 3 or last_date == 23:
             last_date_suffix = "rd"
-            
-        self._apply_cell_style(ws, "G7", f"As at 1st of {month_name} {year}", "label")
-        self._apply_cell_style(ws, "G8", f"As at {last_date}{last_date_suffix} of {month_name} {year}", "label")
         
-        self._apply_cell_style(ws, "H7", odometer_start, "value")
+        return {
+            "H6": f"{year}-{str(year+1)[-2:]}",
+            "G7": f"As at 1st of {month_name} {year}",
+            "G8": f"As at {last_date}{last_date_suffix} of {month_name} {year}",
+            "H7": odometer_start
+        }
+    
+    def _render_header_block(self, writer, year, month, odometer_start):
+        """Style and merge every header cell of a month sheet from scratch"""
+        month_values = self._month_header_values(year, month, odometer_start)
+        
+        # Company header
+        self._apply_cell_style(writer, "A1", "Blink Charging Software Solutions India Private Limited", "title")
+        writer.merge(1, 1, 2, 11)
+        
+        # Basic details section
+        self._apply_cell_style(writer, "A3", "BASIC DETAILS", "section_heading")
+        writer.merge(3, 1, 3, 2)
+        
+        self._apply_cell_style(writer, "A5", "Name:", "label")
+        self._apply_cell_style(writer, "B5", self.config["employee"]["name"], "value")
+        self._apply_cell_style(writer, "A6", "Employee ID:", "label")
+        self._apply_cell_style(writer, "B6", self.config["employee"]["id"], "value")
+        self._apply_cell_style(writer, "A7", "Department:", "label")
+        self._apply_cell_style(writer, "B7", self.config["employee"]["department"], "value")
+        self._apply_cell_style(writer, "A8", "Manager:", "label")
+        self._apply_cell_style(writer, "B8", self.config["employee"]["manager"], "value")
+        
+        # Vehicle details section
+        self._apply_cell_style(writer, "D3", "VEHICLE DETAILS", "section_heading")
+        writer.merge(3, 4, 3, 5)
+        
+        self._apply_cell_style(writer, "D4", "Make:", "label")
+        self._apply_cell_style(writer, "E4", self.config["vehicle"]["make"], "value")
+        self._apply_cell_style(writer, "D5", "Model:", "label")
+        self._apply_cell_style(writer, "E5", self.config["vehicle"]["model"], "value")
+        self._apply_cell_style(writer, "D6", "Year:", "label")
+        self._apply_cell_style(writer, "E6", self.config["vehicle"]["year"], "value")
+        self._apply_cell_style(writer, "D7", "Registration:", "label")
+        self._apply_cell_style(writer, "E7", self.config["vehicle"]["registration"], "value")
+        self._apply_cell_style(writer, "D8", "Engine Size:", "label")
+        self._apply_cell_style(writer, "E8", self.config["vehicle"]["engine_size"], "value")
+        
+        # Odometer reading section
+        self._apply_cell_style(writer, "G3", "ODOMETER READING", "section_heading")
+        writer.merge(3, 7, 3, 8)
+        
+        self._apply_cell_style(writer, "G6", "Financial year:", "label")
+        self._apply_cell_style(writer, "H6", month_values["H6"], "value")
+        
+        # Month details for odometer
+        self._apply_cell_style(writer, "G7", month_values["G7"], "label")
+        self._apply_cell_style(writer, "G8", month_values["G8"], "label")
+        
+        self._apply_cell_style(writer, "H7", month_values["H7"], "value")
         # H8 will be filled after data is populated
         
         # Empty spacer columns
         for i in range(3, 10):
-            self._apply_cell_style(ws, f"K{i}", "", "spacer")
+            self._apply_cell_style(writer, f"K{i}", self._blank(), "spacer")
         
         # Data table headers
         headers = [
@@ -284,140 +673,468 @@ class FuelLogGenerator:
         ]
         
         for cell, value, style in headers:
-            self._apply_cell_style(ws, cell, value, style)
+            self._apply_cell_style(writer, cell, value, style)
         
         # Merge header cells
-        ws.merge_cells(start_row=10, start_column=1, end_row=10, end_column=2)  # Date of Trip
-        ws.merge_cells(start_row=10, start_column=3, end_row=10, end_column=4)  # Odometer Reading
-        ws.merge_cells(start_row=10, start_column=5, end_row=11, end_column=5)  # Purpose of Trip
-        ws.merge_cells(start_row=10, start_column=6, end_row=11, end_column=6)  # Name of Client
-        ws.merge_cells(start_row=10, start_column=7, end_row=11, end_column=7)  # Work-related travel? (Y/N)
-        ws.merge_cells(start_row=10, start_column=8, end_row=11, end_column=8)  # Work-related Travel (KM)
-        ws.merge_cells(start_row=10, start_column=9, end_row=11, end_column=9)  # Personal Travel (KM)
-        ws.merge_cells(start_row=10, start_column=10, end_row=11, end_column=10)  # INR Per KM
-        ws.merge_cells(start_row=10, start_column=11, end_row=11, end_column=11)  # Amount (INR)
-    
-    def _add_sheet_data(self, ws, date_range, odometer_start):
-        """Fill data rows for the given date range"""
-        current_odometer = odometer_start
+        writer.merge(10, 1, 10, 2)  # Date of Trip
+        writer.merge(10, 3, 10, 4)  # Odometer Reading
+        writer.merge(10, 5, 11, 5)  # Purpose of Trip
+        writer.merge(10, 6, 11, 6)  # Name of Client
+        writer.merge(10, 7, 11, 7)  # Work-related travel? (Y/N)
+        writer.merge(10, 8, 11, 8)  # Work-related Travel (KM)
+        writer.merge(10, 9, 11, 9)  # Personal Travel (KM)
+        writer.merge(10, 10, 11, 10)  # INR Per KM
+        writer.merge(10, 11, 11, 11)  # Amount (INR)
+    
+    def _blank(self):
+        """
+        Value of cells that are only there for their borders and fills
+        
+        Compact mode writes them as styled blank cells without a value, instead of
+        empty strings, which still cost a string cell each in the saved XML.
+        """
+        return None if self.config["compact"] else ""
+    
+    def _add_sheet_data(self, writer, month_plan):
+        """Render the data rows of a month from its trip plan"""
+        odometer_start = month_plan.odometer_start[0].item()
         total_cost = 0
-        weekend_count = 0
         last_odometer_value = 0
+        blank = self._blank()
+        personal_travel = self.config["personal_travel"]
+        if personal_travel == "":
+            personal_travel = blank
+        # Trip logs record personal kilometres per day
+        logged = bool(self.config["trip_log"]["path"])
         
-        for i, date in enumerate(date_range, start=12):  # Start filling rows from the 12th row
+        # Start filling rows from the 12th row
+        for i, (date, day_type, day_odometer_start, day_odometer_end, km, rate, amount, personal_km) in enumerate(month_plan.rows(), start=12):
             # Format the date
             date_str = date.strftime("%d/%m/%y")
             
-            # Check if it's a weekend or holiday
-            is_weekend = date.weekday() in [5, 6]  # Saturday or Sunday
-            is_holiday = any(date.date() == h.date() for h in self.config["holidays"])
-            
-            # Apply appropriate styles
-            for col in "ABCDEFGHIJK":
-                cell = ws[f"{col}{i}"]
-                cell.border = self.border_all
-            
-            if is_weekend or is_holiday:
-                if is_weekend:
-                    weekend_count += 1
-                    ws[f"A{i}"].font = self.font_weekend
-                    ws[f"B{i}"].font = self.font_weekend
-                if is_holiday:
-                    ws[f"A{i}"].font = self.font_holiday
-                    ws[f"B{i}"].font = self.font_holiday
-                    ws[f"A{i}"].fill = self.fill_holiday
-                    ws[f"B{i}"].fill = self.fill_holiday
+            if day_type != "work" and logged and personal_km:
+                # Personal trips only: odometer readings and personal kilometres, not work travel
+                date_style = "data" if day_type == "personal" else day_type
+                row_values = [
+                    date_str, date_str,
+                    day_odometer_start, day_odometer_end,
+                    blank, blank, "N", blank,
+                    personal_km,
+                    blank, blank
+                ]
+                for column, (col, value) in enumerate(zip("ABCDEFGHIJK", row_values), start=1):
+                    writer.write(i, column, value, date_style if column <= 2 else "data")
+                    self._track_width(col, value)
                 
-                ws[f"A{i}"].value = date_str
-                ws[f"B{i}"].value = date_str
+                last_odometer_value = day_odometer_end
+            elif day_type != "work":
+                # Weekend dates in red, holiday dates highlighted in blue, working days without logged driving plain
+                date_style = "data" if day_type == "idle" else day_type
+                writer.write(i, 1, date_str, date_style)
+                writer.write(i, 2, date_str, date_style)
+                self._track_width("A", date_str)
+                self._track_width("B", date_str)
                 
-                # Empty cells for weekends and holidays
-                for col in "CDEFGHIJK":
-                    ws[f"{col}{i}"].value = ""
+                # Empty cells for weekends, holidays and idle days
+                for column in range(3, 12):
+                    writer.write(i, column, blank, "data")
             else:
-                # Add dates to the columns
-                ws[f"A{i}"].value = date_str
-                ws[f"B{i}"].value = date_str
-                
-                # Add odometer readings
-                ws[f"C{i}"].value = current_odometer
-                current_odometer += self.config["work_related_km"]
-                ws[f"D{i}"].value = current_odometer
-                
-                # Add work-related travel details
-                ws[f"E{i}"].value = self.config["trip_purpose"]
-                ws[f"F{i}"].value = self.config["client_name"]
-                ws[f"G{i}"].value = self.config["is_work_travel"]
-                ws[f"H{i}"].value = self.config["work_related_km"]
-                ws[f"I{i}"].value = self.config["personal_travel"]
-                ws[f"J{i}"].value = self.config["inr_per_km"]
-                ws[f"K{i}"].value = self.config["work_related_km"] * self.config["inr_per_km"]
+                row_values = [
+                    date_str, date_str,                         # Dates
+                    day_odometer_start, day_odometer_end,       # Odometer readings
+                    self.config["trip_purpose"],                # Work-related travel details
+                    self.config["client_name"],
+                    self.config["is_work_travel"],
+                    km,
+                    personal_km if logged else personal_travel,
+                    rate,
+                    amount
+                ]
+                for column, (col, value) in enumerate(zip("ABCDEFGHIJK", row_values), start=1):
+                    writer.write(i, column, value, "data")
+                    self._track_width(col, value)
                 
                 # Update total cost
-                total_cost += self.config["work_related_km"] * self.config["inr_per_km"]
+                total_cost += amount
                 
                 # Save the last odometer value
-                last_odometer_value = current_odometer
+                last_odometer_value = day_odometer_end
         
         # Add empty rows at the end
         for j in range(1, 5):  # Create 4 empty rows
-            for col in "ABCDEFGHIJK":
-                cell = ws.cell(row=i + j, column=ord(col) - 64)  # Convert letter to column number
-                cell.value = ""
-                cell.border = self.border_all
+            for column in range(1, 12):
+                writer.write(i + j, column, blank, "data")
         
-        # Add total for the month
-        ws.cell(row=i + j, column=11).value = total_cost
+        # Add total for the month; logged kilometres are fractional, so drop float noise
+        total_cost = round(total_cost, 2)
+        writer.write(i + j, 11, total_cost)
+        self._track_width("K", total_cost)
         
         # Set the ending odometer reading
-        ws["H8"] = last_odometer_value
+        writer.write(8, 8, last_odometer_value)
+        self._track_width("H", last_odometer_value)
         
         # Set total travel for the month
-        ws["I7"] = last_odometer_value - odometer_start
-    
-    def _adjust_column_widths(self, ws):
-        """Auto-adjust column widths"""
-        for col in ws.columns:
-            max_length = 0
-            col_letter = get_column_letter(col[0].column)
-            for cell in col:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
+        total_travel = round(last_odometer_value - odometer_start, 2)
+        writer.write(7, 9, total_travel)
+        self._track_width("I", total_travel)
+    
+    def _track_width(self, col_letter, value):
+        """Record the length of a value written to a column, for _adjust_column_widths"""
+        if value:
+            length = len(str(value))
+            if length > self._column_lengths.get(col_letter, 0):
+                self._column_lengths[col_letter] = length
+    
+    def _adjust_column_widths(self, writer):
+        """Auto-adjust column widths from the lengths tracked while writing"""
+        for col_letter in "ABCDEFGHIJK":
             # Set a minimum width
-            ws.column_dimensions[col_letter].width = max(max_length + 2, 12)
+            writer.set_width(col_letter, max(self._column_lengths.get(col_letter, 0) + 2, 12))
         
         # Fix width for specific columns
-        ws.column_dimensions["A"].width = 20  # Date Start
-        ws.column_dimensions["G"].width = 20  # Work-related travel
-        ws.column_dimensions["H"].width = 20  # Work-related KM
-        ws.column_dimensions["I"].width = 15  # Personal Travel
+        writer.set_width("A", 20)  # Date Start
+        writer.set_width("G", 20)  # Work-related travel
+        writer.set_width("H", 20)  # Work-related KM
+        writer.set_width("I", 15)  # Personal Travel
     
-    def generate_workbook(self):
-        """Generate the complete workbook with sheets for each month"""
+    def generate_workbook(self, output=None):
+        """
+        Generate the complete workbook with sheets for each month
+        
+        With ``jobs`` above 1 the months of an openpyxl workbook are rendered in
+        that many worker processes and assembled into one package, see
+        parallel_render. With the output cache, a regular openpyxl workbook is
+        assembled the same way from per-month sheets, of which only the months
+        missing from the cache are rendered. Appending always renders the
+        missing months in-process.
+        
+        Args:
+            output (file-like): Binary stream to write the workbook to instead of
+                ``output_file_path``. Nothing then touches the filesystem unless a
+                metrics or export path is configured: the output cache and
+                appending are skipped, and streaming mode is replaced by a regular
+                in-memory workbook since openpyxl streams through temporary files.
+        """
         self.logger.info("Starting workbook generation")
         
-        # Determine date range from config
-        start_date = self.config["start_date"]
-        end_date = self.config["end_date"]
+        if output is not None and self.config["append"]:
+            self.logger.warning("Appending needs an output file, generating the full range")
+        
+        appending = output is None and self.config["append"] and os.path.exists(self.config["output_file_path"])
+        if appending:
+            if self.config["streaming"]:
+                self.logger.warning("Streaming is not available when appending, using a regular workbook")
+            if self.config["writer"] != "openpyxl":
+                self.logger.warning("Appending needs the openpyxl writer, using it instead")
+                self.config["writer"] = "openpyxl"
+            if not self._prepare_append():
+                self.logger.info(f"{self.config['output_file_path']} is up to date, nothing to append")
+                return
+        elif self.config["writer"] == "openpyxl":
+            # Start from an empty workbook of the right kind: streaming may have been
+            # switched since construction, and a previous run's sheets must not carry over
+            write_only = self.config["streaming"] and output is None
+            if getattr(self.workbook, "write_only", None) != write_only or self.workbook.sheetnames:
+                self.workbook = self._create_workbook(write_only)
+                self._header_template = None
+        
+        metrics_config = self.config["metrics"]
+        if metrics_config["enabled"]:
+            from generation_metrics import GenerationMetrics
+            
+            self.metrics = GenerationMetrics({
+                "employee": self.config["employee"]["id"],
+                "output_file": self.config["output_file_path"] if output is None else "<stream>"
+            })
+        else:
+            self.metrics = None
+        
+        months = self._month_range()
+        
+        # Trip rows come straight from the plan, so they are exported even when the workbook is cached
+        export_config = self.config["export"]
+        if export_config["path"]:
+            with self._phase("export"):
+                self.export_trips(export_config["path"], export_config["format"])
+        
+        # Metrics measure rendering, so runs collecting them neither reuse nor skip work through the cache
+        cache = self._open_cache() if output is None and not appending and self.metrics is None else None
+        if cache is not None:
+            cache_key = self._cache_key()
+            if self._restore_from_cache(cache, cache_key):
+                return
+        
+        # Months are independent once the trip plan is built, so long ranges can render in parallel
+        parallel = self.config["jobs"] > 1 and len(months) > 1 and not appending
+        if parallel and self.config["writer"] != "openpyxl":
+            self.logger.warning("Parallel rendering needs the openpyxl writer, rendering months one by one")
+            parallel = False
+        
+        # Cached regular openpyxl workbooks are assembled from per-month sheets, like parallel ones
+        fragments = cache is not None and self.config["writer"] == "openpyxl" and not self.config["streaming"]
         
-        # Generate sheets for each month in the range
-        current_date = start_date
-        while current_date <= end_date:
-            self._create_month_sheet(current_date.year, current_date.month)
+        parts = None
+        if parallel or fragments:
+            parts = self._render_parts(months, cache if fragments else None, parallel)
+        elif self.config["writer"] == "xlsxwriter":
+            from sheet_writers import XlsxWriterWorkbook
+            
+            # xlsxwriter workbooks are written once, so each run starts a new one
+            if output is None:
+                self.workbook = XlsxWriterWorkbook(self.config["output_file_path"], self.cell_styles,
+                                                   shared_strings=self.config["compact"])
+            else:
+                self.workbook = XlsxWriterWorkbook(output, self.cell_styles, in_memory=True)
+            self._header_template = None
+        
+        if parts is None:
+            # Generate sheets for each month in the range
+            for year, month in months:
+                self._create_month_sheet(year, month)
+        
+        # Save the workbook
+        try:
+            output_start = output.tell() if output is not None else None
+        except (AttributeError, OSError):
+            output_start = None  # Not seekable, e.g. a socket
+        
+        with self._phase("save"):
+            if parts is not None:
+                from parallel_render import write_package
+                
+                sheet_names = [datetime(year, month, 1).strftime("%b%y") for year, month in months]
+                write_package(sheet_names, parts, self.config["output_file_path"] if output is None else output)
+            elif self.config["writer"] == "xlsxwriter":
+                self.workbook.save()
+            else:
+                self.workbook.save(self.config["output_file_path"] if output is None else output)
+        
+        if output is None:
+            self.logger.info(f"Workbook saved to {self.config['output_file_path']}")
+        else:
+            self.logger.info("Workbook written to the output stream")
+        
+        if cache is not None:
+            cache.store(cache_key, self.config["output_file_path"])
+        
+        if self.metrics is not None:
+            if output is None:
+                self.metrics.saved_bytes = os.path.getsize(self.config["output_file_path"])
+            elif output_start is not None:
+                self.metrics.saved_bytes = output.tell() - output_start
+            if metrics_config["path"]:
+                self.metrics.export(metrics_config["path"], metrics_config["format"])
+    
+    def _render_parts(self, months, cache, parallel):
+        """
+        Month sheets as parts for parallel_render.write_package
+        
+        Sheets found in the cache under their _sheet_cache_key are reused; the
+        rest are rendered, in worker processes when ``parallel`` is set, and
+        added to the cache.
+        
+        Args:
+            months (list): (year, month) pairs
+            cache (OutputCache): Cache to reuse and store sheets in, or None
+            parallel (bool): Render the missing months in a process pool
+        
+        Returns:
+            list: (sheet XML, styles.xml, sheet metrics or None) per month, in month order
+        """
+        from parallel_render import SheetRenderer, render_months
+        
+        parts = [None] * len(months)
+        sheet_keys = [None] * len(months)
+        if cache is not None:
+            for index, (year, month) in enumerate(months):
+                sheet_keys[index] = self._sheet_cache_key(year, month)
+                sheet_xml = cache.lookup_sheet(sheet_keys[index])
+                if sheet_xml is not None:
+                    parts[index] = sheet_xml
+        
+        missing = [index for index, part in enumerate(parts) if part is None]
+        in_process = not parallel or len(missing) <= 1
+        # Cached sheets share the renderer's base style table
+        renderer = SheetRenderer(self) if in_process or cache is not None else None
+        
+        if not in_process:
+            with self._phase("render"):
+                rendered = render_months(self, [months[index] for index in missing], self.config["jobs"])
+            if self.metrics is not None:
+                self.metrics.sheets.extend(sheet_metrics for _, _, sheet_metrics in rendered)
+        else:
+            rendered = [renderer.render(*months[index]) + (None,) for index in missing]
+        
+        for index, part in zip(missing, rendered):
+            parts[index] = part
+            # A sheet that grew the style table can't share the base one with cached sheets
+            if cache is not None and part[1] == renderer.base_styles:
+                cache.store_sheet(sheet_keys[index], part[0])
+        
+        if cache is not None:
+            self.logger.info(f"Reused {len(months) - len(missing)} of {len(months)} month sheets from the cache")
+        return [part if isinstance(part, tuple) else (part, renderer.base_styles, None) for part in parts]
+    
+    def generate_bytes(self):
+        """
+        Generate the workbook in memory
+        
+        Returns:
+            bytes: The xlsx file contents
+        """
+        import io
+        
+        buffer = io.BytesIO()
+        self.generate_workbook(output=buffer)
+        return buffer.getvalue()
+    
+    def trip_columns(self):
+        """
+        Trip rows for every working day in the configured range, as columns; with a
+        trip log, only the days with logged work trips
+        
+        Returns:
+            dict: Equal-length arrays keyed by ``trip_export.TRIP_FIELDS``
+        """
+        import numpy as np
+        from trip_plan import DAY_WORK
+        
+        plan = self._get_trip_plan()
+        trips = plan[plan.day_type == DAY_WORK]
+        trip_count = len(trips)
+        return {
+            "employee_id": np.full(trip_count, self.config["employee"]["id"], dtype=object),
+            "date": trips.dates,
+            "odometer_start": trips.odometer_start,
+            "odometer_end": trips.odometer_end,
+            "purpose": np.full(trip_count, self.config["trip_purpose"], dtype=object),
+            "client": np.full(trip_count, self.config["client_name"], dtype=object),
+            "km": trips.km,
+            "amount": trips.amount
+        }
+    
+    def export_trips(self, path, output_format="csv"):
+        """
+        Write the trip rows to a CSV, JSON Lines or Parquet file without touching Excel
+        
+        Args:
+            path (str): Output file, replaced if it exists
+            output_format (str): ``csv``, ``jsonl`` or ``parquet``
+        """
+        from trip_export import TripExporter
+        
+        with TripExporter(path, output_format) as exporter:
+            exporter.write(self.trip_columns())
+        self.logger.info(f"Exported {exporter.rows_written} trips to {path}")
+    
+    def _month_range(self):
+        """(year, month) pairs from the configured start month to the end month"""
+        months = []
+        current_date = self.config["start_date"]
+        while current_date <= self.config["end_date"]:
+            months.append((current_date.year, current_date.month))
             
             # Move to next month
             if current_date.month == 12:
                 current_date = datetime(current_date.year + 1, 1, 1)
             else:
                 current_date = datetime(current_date.year, current_date.month + 1, 1)
+        return months
+    
+    def _open_cache(self):
+        """Return the OutputCache configured for this run, or None when caching is disabled"""
+        cache_config = self.config["cache"]
+        if not cache_config["enabled"]:
+            return None
         
-        # Save the workbook
-        self.workbook.save(self.config["output_file_path"])
-        self.logger.info(f"Workbook saved to {self.config['output_file_path']}")
+        from output_cache import OutputCache
+        return OutputCache(cache_config["dir"], cache_config["max_mb"], cache_config["max_age_days"])
+    
+    def _cache_key(self):
+        """Hash of the effective config and generator version, identifying the workbook they produce"""
+        effective = {key: value for key, value in self.config.items() if key not in _CACHE_NEUTRAL_KEYS}
+        effective["holidays"] = sorted(holiday.isoformat() for holiday in self._get_holidays())
+        if self.config["trip_log"]["path"]:
+            # The workbook follows the log's contents, so a rewritten log must miss the cache
+            stat = os.stat(self.config["trip_log"]["path"])
+            effective["trip_log_file"] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        return _hash_canonical({"version": GENERATOR_VERSION, "config": effective})
+    
+    def _sheet_cache_key(self, year, month):
+        """Hash of everything a month sheet is rendered from: its planned days and the per-sheet settings"""
+        month_plan = self._get_trip_plan().month(year, month)
+        digest = hashlib.sha256(_hash_canonical({
+            "version": GENERATOR_VERSION,
+            "config": {key: self.config[key] for key in _SHEET_CONFIG_KEYS},
+            "logged": bool(self.config["trip_log"]["path"])
+        }).encode())
+        for name in month_plan.__slots__:
+            digest.update(getattr(month_plan, name).tobytes())
+        return digest.hexdigest()
+    
+    def _restore_from_cache(self, cache, cache_key):
+        """
+        Skip generation when this config has been generated before
+        
+        Returns:
+            bool: True if the output file now holds the cached workbook
+        """
+        meta = cache.lookup(cache_key)
+        if meta is None:
+            return False
+        
+        path = self.config["output_file_path"]
+        if cache.is_intact(path, meta):
+            cache.touch(cache_key)
+            self.logger.info(f"{path} is up to date with the config, skipping generation")
+        else:
+            cache.restore(cache_key, path)
+            self.logger.info(f"Restored {path} from the cache")
+        return True
+    
+    def _prepare_append(self):
+        """
+        Open the existing workbook and move the range start past its last month sheet
+        
+        The closing odometer (H8) of the last month becomes the opening reading of
+        the next one, so only the missing months are generated.
+        
+        Returns:
+            bool: True if there are months left to add
+        """
+        import openpyxl # type: ignore
+        
+        path = self.config["output_file_path"]
+        workbook = openpyxl.load_workbook(path)
+        
+        month_sheets = {}
+        for ws in workbook.worksheets:
+            try:
+                month_sheets[datetime.strptime(ws.title, "%b%y")] = ws
+            except ValueError:
+                continue  # Not a month sheet
         
+        self.workbook = workbook
+        self._header_template = None
+        if not month_sheets:
+            self.logger.info(f"No month sheets in {path}, adding the full range")
+            return True
+        
+        last_month = max(month_sheets)
+        last_sheet = month_sheets[last_month]
+        
+        # H8 is 0 for a month without workdays, in which case the opening reading still holds
+        closing_odometer = last_sheet["H8"].value or last_sheet["H7"].value
+        next_month = (last_month + timedelta(days=32)).replace(day=1)
+        
+        self._update_config({"start_date": next_month, "initial_odometer": closing_odometer})
+        if next_month > self.config["end_date"]:
+            return False
+        
+        self.logger.info(f"Appending to {path} from {next_month.strftime('%b%y')}, opening odometer {closing_odometer}")
+        return True
+    
     @classmethod
     def from_json_file(cls, json_file_path):
         """Create a FuelLogGenerator instance from a JSON configuration file"""
@@ -426,28 +1143,287 @@ class FuelLogGenerator:
                 config = json.load(file)
                 return cls(config)
         except Exception as e:
-            logging.error(f"Error loading configuration from {json_file_path}: {e}")
+            logging.getLogger('FuelLogGenerator').error(f"Error loading configuration from {json_file_path}: {e}")
             return cls()
 
 
+def _coerce_roster_value(template, raw):
+    """Convert a CSV cell to the type of the matching base config value"""
+    if isinstance(template, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "y")
+    if isinstance(template, int):
+        return int(raw)
+    if isinstance(template, float):
+        return float(raw)
+    if isinstance(template, list):
+        # Lists such as holidays are written as semicolon separated values
+        return [item.strip() for item in raw.split(";") if item.strip()]
+    return raw
+
+
+def _csv_roster_record(row, base_config):
+    """Turn a CSV row with dotted headers (e.g. ``employee.name``) into a nested record"""
+    record = {}
+    for column, raw in row.items():
+        # Empty cells fall back to the base config
+        if not column or raw is None or raw == "":
+            continue
+        
+        keys = column.strip().split(".")
+        template = base_config
+        target = record
+        for key in keys[:-1]:
+            template = template.get(key, {}) if isinstance(template, dict) else {}
+            target = target.setdefault(key, {})
+        template = template.get(keys[-1]) if isinstance(template, dict) else None
+        target[keys[-1]] = _coerce_roster_value(template, raw)
+    
+    return record
+
+
+def iter_roster(roster_path, base_config=None):
+    """
+    Stream records from a JSON Lines or CSV roster one line at a time
+    
+    Args:
+        roster_path (str): Path to a ``.jsonl`` or ``.csv`` roster
+        base_config (dict): Config used to type CSV cells
+        
+    Yields:
+        tuple: (line_number, record, error) where exactly one of record/error is set
+    """
+    base_config = base_config or DEFAULT_CONFIG
+    
+    with open(roster_path, 'r', newline='') as file:
+        if roster_path.lower().endswith(".csv"):
+            reader = csv.DictReader(file)
+            for row in reader:
+                try:
+                    yield reader.line_num, _csv_roster_record(row, base_config), None
+                except ValueError as e:
+                    yield reader.line_num, None, e
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("roster record must be a JSON object")
+                    yield line_number, record, None
+                except ValueError as e:
+                    yield line_number, None, e
+
+
+def _roster_output_path(config):
+    """Default output path for a roster record: the base file name prefixed with the employee ID"""
+    directory, file_name = os.path.split(config["output_file_path"])
+    return os.path.join(directory, f"{config['employee']['id']}_{file_name}")
+
+
+def _generate_roster_record(config, with_trips=False, in_memory=False):
+    """
+    Worker entry point: generate a single roster workbook
+    
+    Args:
+        config (dict): The record's effective config
+        with_trips (bool): Also return the trip columns for the batch export
+        in_memory (bool): Return the xlsx contents for the batch archive instead of saving the file
+    
+    Returns:
+        tuple: The workbook path, its trip columns or None, and the xlsx contents
+            with the manifest totals or None
+    """
+    generator = FuelLogGenerator(config)
+    if not in_memory:
+        generator.generate_workbook()
+        return generator.config["output_file_path"], generator.trip_columns() if with_trips else None, None
+    
+    from batch_archive import manifest_row
+    
+    data = generator.generate_bytes()
+    trips = generator.trip_columns()
+    workbook = data, manifest_row(generator.config, trips)
+    return generator.config["output_file_path"], trips if with_trips else None, workbook
+
+
+def run_roster_batch(roster_path, base_config=None, jobs=1):
+    """
+    Generate one workbook per roster record
+    
+    Each record is merged into the base config the same way ``_update_config``
+    merges config files. Records are read lazily and at most ``2 * jobs`` are in
+    flight at once, so the roster never has to fit in memory. Results are taken
+    in roster order. A failing record is logged and counted without stopping the
+    batch. If the base config sets an export path, the trips of every record
+    are streamed into that one file. If it sets an archive path, workbooks are
+    built in memory and streamed into that one ZIP or tar archive with a
+    manifest, instead of being saved as separate files.
+    
+    Args:
+        roster_path (str): Path to a ``.jsonl`` or ``.csv`` roster
+        base_config (dict): Settings shared by every record
+        jobs (int): Number of worker processes; 1 generates in-process
+        
+    Returns:
+        dict: Count of ``succeeded`` records and ``failed`` (line_number, error) pairs
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from collections import deque
+    import multiprocessing
+    
+    logger = logging.getLogger('FuelLogGenerator')
+    
+    base = deepcopy(DEFAULT_CONFIG)
+    if base_config:
+        _deep_update(base, deepcopy(base_config))
+    
+    summary = {"succeeded": 0, "failed": []}
+    
+    # Workers hand their trips back for the combined export instead of writing their own
+    exporter = None
+    if base["export"]["path"]:
+        from trip_export import TripExporter
+        
+        exporter = TripExporter(base["export"]["path"], base["export"]["format"])
+        base["export"]["path"] = None
+    
+    archive = None
+    if base["archive"]["path"]:
+        from batch_archive import BatchArchive
+        
+        archive = BatchArchive(base["archive"]["path"], base["archive"]["format"])
+        base["archive"]["path"] = None
+    
+    def record_configs():
+        for line_number, record, error in iter_roster(roster_path, base):
+            if error is not None:
+                logger.error(f"Roster line {line_number} could not be parsed: {error}")
+                summary["failed"].append((line_number, str(error)))
+                continue
+            
+            config = deepcopy(base)
+            _deep_update(config, record)
+            # Records are already spread over the pool, so each renders its months in-process
+            config["jobs"] = 1
+            if "output_file_path" not in record:
+                config["output_file_path"] = _roster_output_path(config)
+            yield line_number, config
+    
+    def record_result(line_number, run):
+        try:
+            output_path, trips, workbook = run()
+            if workbook is not None:
+                archive.add(output_path, *workbook)
+            if trips is not None:
+                exporter.write(trips)
+            summary["succeeded"] += 1
+        except Exception as e:
+            logger.error(f"Roster line {line_number} failed: {e}")
+            summary["failed"].append((line_number, str(e)))
+    
+    with_trips = exporter is not None
+    in_memory = archive is not None
+    if jobs <= 1:
+        for line_number, config in record_configs():
+            record_result(line_number, lambda: _generate_roster_record(config, with_trips, in_memory))
+    else:
+        # Workers queue their log records back to this process's listener
+        context = multiprocessing.get_context()
+        worker_logging, forwarder = _start_worker_log_forwarder(context)
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                                 initializer=_init_worker_logging, initargs=worker_logging) as executor:
+            # Bound the number of queued records so the roster keeps streaming, and
+            # take results in submission order so exports and archives are deterministic
+            pending = deque()
+            for line_number, config in record_configs():
+                if len(pending) >= jobs * 2:
+                    record_result(*pending.popleft())
+                future = executor.submit(_generate_roster_record, config, with_trips, in_memory)
+                pending.append((line_number, future.result))
+            
+            while pending:
+                record_result(*pending.popleft())
+        
+        if forwarder is not None:
+            forwarder.stop()
+    
+    if exporter is not None:
+        exporter.close()
+        logger.info(f"Exported {exporter.rows_written} trips to {exporter.path}")
+    if archive is not None:
+        archive.close()
+        logger.info(f"Archived {archive.entries_written} workbooks to {archive.path}")
+    elif base["cache"]["enabled"]:
+        from output_cache import OutputCache
+        
+        # Records only evict once a minute, so trim what the batch added in one pass
+        cache_config = base["cache"]
+        OutputCache(cache_config["dir"], cache_config["max_mb"], cache_config["max_age_days"]).evict()
+    
+    summary["failed"].sort()
+    logger.info(f"Roster batch finished: {summary['succeeded']} succeeded, {len(summary['failed'])} failed")
+    for line_number, error in summary["failed"]:
+        logger.info(f"  line {line_number}: {error}")
+    
+    return summary
+
+
 def main():
     """Main function to run the generator from command line"""
     parser = argparse.ArgumentParser(description='Generate a fuel log workbook for expense tracking.')
+    parser.add_argument('command', nargs='?', choices=['serve', 'audit', 'consolidate'],
+                        help='"serve" runs an HTTP service rendering workbooks from posted JSON configs, '
+                             '"audit" checks the odometer chain and totals of existing workbooks, '
+                             '"consolidate" summarizes their month totals into --output')
+    parser.add_argument('paths', nargs='*', help='Workbooks and directories to audit or consolidate')
     parser.add_argument('--config', '-c', help='Path to JSON configuration file')
     parser.add_argument('--output', '-o', help='Output Excel file path')
     parser.add_argument('--start-date', help='Start date in YYYY-MM-DD format')
     parser.add_argument('--end-date', help='End date in YYYY-MM-DD format')
     parser.add_argument('--initial-odometer', type=int, help='Initial odometer reading')
-    parser.add_argument('--km-per-day', type=int, help='Work-related kilometers per day')
-    parser.add_argument('--rate-per-km', type=int, help='Rate per kilometer in INR')
+    parser.add_argument('--km-per-day', type=int, help='Work-related kilometers per day before the first scheduled change')
+    parser.add_argument('--rate-per-km', type=int, help='Rate per kilometer in INR before the first scheduled change')
+    parser.add_argument('--holiday-calendar', metavar='NAME', help='Named holiday calendar; config holidays are added to it')
+    parser.add_argument('--trip-log', metavar='PATH', help='GPS/odometer trip log CSV to fill the rows from instead of a fixed daily distance')
+    parser.add_argument('--writer', choices=['openpyxl', 'xlsxwriter'], help='Workbook writer backend (default: openpyxl)')
+    parser.add_argument('--compact', action='store_true', help='Write blank cells without values and share repeated text where the writer can')
+    parser.add_argument('--streaming', action='store_true', help='Stream sheets through a write-only workbook to keep memory flat')
+    parser.add_argument('--append', action='store_true', help='Add only the months missing from an existing output workbook')
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument('--cache', action='store_true', help='Reuse and update the output cache in the cache directory (default: .fuel_log_cache)')
+    cache_group.add_argument('--no-cache', action='store_true', help='Always regenerate, ignoring and not updating the output cache')
+    parser.add_argument('--metrics', metavar='PATH', help='Record per-phase timings and counters to this file')
+    parser.add_argument('--metrics-format', choices=['jsonl', 'prometheus'], help='Metrics file format (default: jsonl)')
+    parser.add_argument('--export', metavar='PATH', help='Also write the trip rows to this file (one file for a whole roster)')
+    parser.add_argument('--export-format', choices=['csv', 'jsonl', 'parquet'], help='Trip export format (default: csv)')
+    parser.add_argument('--archive', metavar='PATH', help='Stream roster workbooks into this one archive instead of separate files')
+    parser.add_argument('--archive-format', choices=['zip', 'tar', 'tar.gz'], help='Roster archive format (default: zip)')
+    parser.add_argument('--log-level', choices=list(LOG_LEVELS),
+                        help='Logging level; "quiet" drops per-holiday and per-sheet messages (default: info, quiet for rosters)')
+    parser.add_argument('--roster', help='JSON Lines or CSV roster with one employee config per record')
+    parser.add_argument('--jobs', '-j', type=int,
+                        help='Worker processes for roster batches, the service, audits and consolidation (default: one per CPU), '
+                             'or for rendering the months of a single workbook in parallel (default: 1)')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface the service listens on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port the service listens on (default: 8080)')
+    parser.add_argument('--max-pending', type=int, help='Requests the service accepts at once before answering 503 (default: twice --jobs)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds the service waits for a workbook before answering 504')
+    parser.add_argument('--max-months', type=int, default=120, help='Months one service request may span before it is refused with 422')
+    parser.add_argument('--report', metavar='PATH', help='Audit mismatch report (default: standard output)')
+    parser.add_argument('--index', metavar='PATH', help='Consolidation index of already read workbooks (default: .fuel_log_cache/fleet_index.json)')
     
     args = parser.parse_args()
+    if args.archive and not args.roster:
+        parser.error("--archive needs --roster")
+    if args.paths and args.command not in ("audit", "consolidate"):
+        parser.error("workbook paths are only taken by audit and consolidate")
+    if args.command in ("audit", "consolidate") and not args.paths:
+        parser.error(f"{args.command} needs at least one workbook or directory")
+    if args.command == "consolidate" and not args.output:
+        parser.error("consolidate needs --output for the summary (.xlsx or .csv)")
     
-    # Create generator with config file if provided
-    if args.config:
-        generator = FuelLogGenerator.from_json_file(args.config)
-    else:
-        generator = FuelLogGenerator()
+    configure_logging(args.log_level or ("quiet" if args.roster or args.command else "info"))
     
     # Override with command line arguments
     config_overrides = {}
@@ -464,6 +1440,80 @@ def main():
         config_overrides["work_related_km"] = args.km_per_day
     if args.rate_per_km:
         config_overrides["inr_per_km"] = args.rate_per_km
+    if args.holiday_calendar:
+        config_overrides["holiday_calendar"] = args.holiday_calendar
+    if args.trip_log:
+        config_overrides["trip_log"] = {"path": args.trip_log}
+    if args.writer:
+        config_overrides["writer"] = args.writer
+    if args.compact:
+        config_overrides["compact"] = True
+    if args.streaming:
+        config_overrides["streaming"] = True
+    if args.append:
+        config_overrides["append"] = True
+    if args.cache:
+        config_overrides["cache"] = {"enabled": True}
+    if args.no_cache:
+        config_overrides["cache"] = {"enabled": False}
+    if args.metrics:
+        config_overrides["metrics"] = {"enabled": True, "path": args.metrics}
+    if args.metrics_format:
+        config_overrides.setdefault("metrics", {})["format"] = args.metrics_format
+    if args.export:
+        config_overrides["export"] = {"path": args.export}
+    if args.export_format:
+        config_overrides.setdefault("export", {})["format"] = args.export_format
+    if args.archive:
+        config_overrides["archive"] = {"path": args.archive}
+    if args.archive_format:
+        config_overrides.setdefault("archive", {})["format"] = args.archive_format
+    if args.jobs and not (args.roster or args.command):
+        config_overrides["jobs"] = args.jobs
+    
+    jobs = args.jobs or os.cpu_count() or 1
+    
+    # Roster batches and the service use the config file and overrides as the base for every record
+    if args.roster or args.command:
+        base_config = {}
+        if args.config:
+            with open(args.config, 'r') as file:
+                base_config = json.load(file)
+        _deep_update(base_config, config_overrides)
+    
+    if args.command == "audit":
+        from workbook_audit import run_audit
+        
+        summary = run_audit(args.paths, jobs=jobs, report_path=args.report)
+        if summary["failed"]:
+            raise SystemExit(1)
+        return
+    
+    if args.command == "consolidate":
+        from fleet_report import DEFAULT_INDEX_PATH, consolidate
+        
+        summary = consolidate(args.paths, args.output, args.index or DEFAULT_INDEX_PATH, jobs=jobs)
+        if summary["failed"]:
+            raise SystemExit(1)
+        return
+    
+    if args.command == "serve":
+        from generation_service import serve
+        
+        serve(base_config, args.host, args.port, workers=jobs, max_pending=args.max_pending, timeout=args.timeout, max_months=args.max_months)
+        return
+    
+    if args.roster:
+        summary = run_roster_batch(args.roster, base_config, jobs=jobs)
+        if summary["failed"]:
+            raise SystemExit(1)
+        return
+    
+    # Create generator with config file if provided
+    if args.config:
+        generator = FuelLogGenerator.from_json_file(args.config)
+    else:
+        generator = FuelLogGenerator()
     
     if config_overrides:
         generator._update_config(config_overrides)
@@ -0,0 +1,122 @@
+"""Optional per-phase timings and counters for FuelLogGenerator runs"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def _escape_label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class GenerationMetrics:
+    """
+    Collects phase timings and counters while one workbook is generated
+
+    Sheet phases are ``odometer``, ``header``, ``data``, ``column_widths`` and, in
+    streaming mode or with the xlsxwriter writer, ``stream``. ``save`` and, when
+    trips are exported, ``export`` are recorded once per workbook.
+    """
+
+    def __init__(self, labels=None):
+        """
+        Args:
+            labels (dict): Values identifying the run, e.g. employee ID and output file
+        """
+        self.labels = labels or {}
+        self.sheets = []
+        self.workbook_phases = {}
+        self.saved_bytes = 0
+        self._current_sheet = None
+
+    def start_sheet(self, sheet_name):
+        """Attribute the following phases and counters to a new sheet"""
+        self._current_sheet = {"sheet": sheet_name, "phases_s": {}, "cells": 0, "styled_cells": 0}
+        self.sheets.append(self._current_sheet)
+
+    def end_sheet(self):
+        """Attribute the following phases to the workbook as a whole"""
+        self._current_sheet = None
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block and add it to the current sheet or the workbook"""
+        phases = self._current_sheet["phases_s"] if self._current_sheet is not None else self.workbook_phases
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count_cells(self, cells, styled_cells):
+        """Record how many cells the current sheet holds and how many of them are styled"""
+        self._current_sheet["cells"] = cells
+        self._current_sheet["styled_cells"] = styled_cells
+
+    def phase_totals(self):
+        """Seconds per phase summed over all sheets and the workbook"""
+        totals = dict(self.workbook_phases)
+        for sheet in self.sheets:
+            for name, seconds in sheet["phases_s"].items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def summary(self):
+        """Workbook level totals"""
+        return {
+            **self.labels,
+            "sheets": len(self.sheets),
+            "phases_s": self.phase_totals(),
+            "cells": sum(sheet["cells"] for sheet in self.sheets),
+            "styled_cells": sum(sheet["styled_cells"] for sheet in self.sheets),
+            "saved_bytes": self.saved_bytes
+        }
+
+    def write_jsonl(self, path):
+        """Append one line per sheet and a workbook summary line to a JSON Lines file"""
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        records = [{"type": "sheet", "timestamp": timestamp, **self.labels, **sheet} for sheet in self.sheets]
+        records.append({"type": "workbook", "timestamp": timestamp, **self.summary()})
+
+        with open(path, "a") as file:
+            file.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def write_prometheus(self, path):
+        """Replace a Prometheus textfile-collector file with this run's totals"""
+        def labels(**extra):
+            pairs = {**self.labels, **extra}
+            return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs.items()) + "}"
+
+        summary = self.summary()
+        lines = [
+            "# HELP fuel_log_phase_seconds Seconds spent in each generation phase of the last workbook",
+            "# TYPE fuel_log_phase_seconds gauge"
+        ]
+        lines += [f"fuel_log_phase_seconds{labels(phase=name)} {seconds:.6f}" for name, seconds in sorted(summary["phases_s"].items())]
+        for metric, key, help_text in (
+            ("fuel_log_sheets", "sheets", "Sheets in the last workbook"),
+            ("fuel_log_cells_written", "cells", "Cells written to the last workbook"),
+            ("fuel_log_styled_cells", "styled_cells", "Styled cells in the last workbook"),
+            ("fuel_log_saved_bytes", "saved_bytes", "Size of the last saved workbook in bytes")
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", f"{metric}{labels()} {summary[key]}"]
+        lines += [
+            "# HELP fuel_log_last_run_timestamp_seconds Unix time the last workbook finished",
+            "# TYPE fuel_log_last_run_timestamp_seconds gauge",
+            f"fuel_log_last_run_timestamp_seconds{labels()} {time.time():.0f}"
+        ]
+
+        # Write atomically so the collector never reads a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+
+    def export(self, path, output_format="jsonl"):
+        """Write the metrics as ``jsonl`` or ``prometheus``"""
+        if output_format == "prometheus":
+            self.write_prometheus(path)
+        else:
+            self.write_jsonl(path)
@@ -0,0 +1,440 @@
+"""
+Long-running HTTP service that renders fuel log workbooks from JSON configs
+
+``POST /generate`` takes a config object, merged into the service's base
+config the same way roster records are, and answers with the xlsx. Workbooks
+are rendered by a pool of worker processes that import openpyxl and NumPy and
+build a generator once at startup, so a request only pays for its own
+rendering. ``GET /metrics`` reports latency percentiles and throughput and
+``GET /health`` answers once the pool is warm. Only the standard library is
+used; the HTTP handling is the small subset of HTTP/1.1 the endpoints need.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, deque
+from copy import deepcopy
+from datetime import datetime
+from urllib.parse import quote
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Largest accepted request body and header block
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+
+# Seconds an idle keep-alive connection or a slow request body is waited for
+READ_TIMEOUT = 15.0
+
+# Default limit on the month sheets of one request, so no render can run unbounded
+MAX_MONTHS = 120
+
+# Successful renders kept for the latency percentiles, and the throughput window
+LATENCY_WINDOW = 1024
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
+# Settings a request may not change: they would read or write files on the server
+_SERVER_ONLY_KEYS = ("append", "metrics", "export", "archive", "cache", "calendar_dir", "streaming", "jobs", "trip_log")
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout"
+}
+
+# Per worker process: the warm generator, the base config requests are merged
+# into and the barrier startup waits on
+_worker_generator = None
+_worker_base_config = None
+_worker_barrier = None
+
+
+def _init_service_worker(base_config, barrier, log_queue, level, detail_level):
+    """Process pool initializer: set up logging and warm up a generator with a one-month render"""
+    global _worker_generator, _worker_base_config, _worker_barrier
+    from fuel_log_v2 import FuelLogGenerator, _init_worker_logging
+
+    _init_worker_logging(log_queue, level, detail_level)
+    _worker_base_config = base_config
+    _worker_barrier = barrier
+
+    # Imports openpyxl and NumPy, builds the styles and loads the modules only used when saving
+    warm_up_config = deepcopy(base_config)
+    warm_up_config["end_date"] = warm_up_config["start_date"]
+    _worker_generator = FuelLogGenerator(warm_up_config)
+    _worker_generator.generate_bytes()
+
+
+def _worker_ready():
+    """
+    Startup task, returns the worker's pid
+
+    Every worker has to reach the barrier before any task returns, so one
+    process that warmed up early can't run the tasks meant for the others.
+    """
+    _worker_barrier.wait()
+    return os.getpid()
+
+
+def _render_request(request_config):
+    """
+    Worker entry point: render one request with the process's warm generator
+
+    Returns:
+        tuple: Download file name and the xlsx contents
+    """
+    from fuel_log_v2 import _deep_update
+
+    config = deepcopy(_worker_base_config)
+    _deep_update(config, request_config)
+    _worker_generator.reset(config)
+
+    file_name = os.path.basename(_worker_generator.config["output_file_path"]) or "Log_Book.xlsx"
+    return file_name, _worker_generator.generate_bytes()
+
+
+def _content_disposition(file_name):
+    """
+    Content-Disposition header for a download name taken from the request
+
+    Control characters, quotes and backslashes are dropped so the name can't
+    end the header or the quoted string. ``filename`` is an ASCII fallback and
+    ``filename*`` carries the full name, as RFC 6266 recommends.
+    """
+    file_name = re.sub(r'[\x00-\x1f\x7f"\\]', "", file_name).strip() or "Log_Book.xlsx"
+    fallback = file_name.encode("ascii", "replace").decode("ascii").replace("?", "_")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name, safe='')}"
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 2)
+
+
+class ServiceMetrics:
+    """Request counters, latency of recent renders and completions over the last minute"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.statuses = Counter()
+        self.rejected = 0
+        self.timed_out = 0
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self.completions = deque()
+
+    def record_render(self, seconds):
+        now = time.monotonic()
+        self.latencies_ms.append(seconds * 1000)
+        self.completions.append(now)
+        self._trim(now)
+
+    def _trim(self, now):
+        while self.completions and now - self.completions[0] > THROUGHPUT_WINDOW_SECONDS:
+            self.completions.popleft()
+
+    def snapshot(self, pending, workers, max_pending):
+        """
+        Returns:
+            dict: Counters, latency percentiles in milliseconds and workbooks per second
+        """
+        now = time.monotonic()
+        self._trim(now)
+        uptime = now - self.started
+        window = min(uptime, THROUGHPUT_WINDOW_SECONDS)
+        latencies = sorted(self.latencies_ms)
+        return {
+            "uptime_s": round(uptime, 1),
+            "workers": workers,
+            "max_pending": max_pending,
+            "pending": pending,
+            "requests": {str(status): count for status, count in sorted(self.statuses.items())},
+            "generated": self.statuses[200],
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "throughput_per_s": round(len(self.completions) / window, 2) if window > 0 else 0.0,
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": _percentile(latencies, 0.50),
+                "p95": _percentile(latencies, 0.95),
+                "p99": _percentile(latencies, 0.99),
+                "max": round(latencies[-1], 2) if latencies else None
+            }
+        }
+
+
+class GenerationService:
+    """
+    asyncio HTTP front end for a pool of warm generator processes
+
+    At most ``max_pending`` renders are accepted at once, running or waiting
+    for a worker; further requests are answered with 503 straight away instead
+    of queueing without bound. A render that takes longer than ``timeout``
+    seconds is answered with 504, and its slot is only released once the
+    worker has actually finished, so timed-out work can't pile up behind the
+    limit. Requests spanning more than ``max_months`` months are refused
+    before they reach a worker, which bounds how long that can take.
+    """
+
+    def __init__(self, base_config=None, workers=None, max_pending=None, timeout=30.0, max_months=MAX_MONTHS):
+        """
+        Args:
+            base_config (dict): Settings every request is merged into
+            workers (int): Worker processes (default: CPU count)
+            max_pending (int): Renders accepted at once (default: twice the workers)
+            timeout (float): Seconds a request waits for its workbook
+            max_months (int): Month sheets one request may span
+        """
+        from fuel_log_v2 import DEFAULT_CONFIG, _deep_update
+
+        self.base_config = deepcopy(DEFAULT_CONFIG)
+        if base_config:
+            _deep_update(self.base_config, deepcopy(base_config))
+        for key in _SERVER_ONLY_KEYS:
+            self.base_config[key] = deepcopy(DEFAULT_CONFIG[key])
+        self.base_config["cache"]["enabled"] = False
+
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self.timeout = timeout
+        self.max_months = max_months
+        self.metrics = ServiceMetrics()
+        self.pending = 0
+        self.executor = None
+        self.logger = logging.getLogger('FuelLogGenerator.service')
+        self._forwarder = None
+
+    async def start_pool(self):
+        """Start the worker processes and wait until every one of them is warm"""
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+        from fuel_log_v2 import _start_worker_log_forwarder
+
+        context = multiprocessing.get_context()
+        worker_logging, self._forwarder = _start_worker_log_forwarder(context)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_service_worker, initargs=(self.base_config, context.Barrier(self.workers), *worker_logging)
+        )
+
+        # Workers may be started on demand, so submit one task per worker up front
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self.executor, _worker_ready) for _ in range(self.workers)))
+        self.logger.info(f"{len(set(pids))} workers warmed up in {time.perf_counter() - start:.2f}s")
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        if self._forwarder is not None:
+            self._forwarder.stop()
+            self._forwarder = None
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it or asks to"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), READ_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break  # Idle keep-alive connection or client went away
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 400, {"error": "Request headers too large"}, keep_alive=False)
+                    break
+
+                request = self._parse_head(head)
+                if request is None:
+                    await self._respond(writer, 400, {"error": "Malformed request"}, keep_alive=False)
+                    break
+                method, path, headers, keep_alive = request
+
+                body = b""
+                if method == "POST":
+                    length = headers.get("content-length")
+                    if length is None or not length.isdigit():
+                        await self._respond(writer, 411, {"error": "Content-Length required"}, keep_alive=False)
+                        break
+                    if int(length) > MAX_BODY_BYTES:
+                        await self._respond(writer, 413, {"error": f"Body larger than {MAX_BODY_BYTES} bytes"}, keep_alive=False)
+                        break
+                    try:
+                        body = await asyncio.wait_for(reader.readexactly(int(length)), READ_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        await self._respond(writer, 408, {"error": "Timed out reading the body"}, keep_alive=False)
+                        break
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                status, payload, extra_headers = await self.dispatch(method, path, body)
+                await self._respond(writer, status, payload, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head):
+        """
+        Returns:
+            tuple: (method, path, lowercased headers, keep_alive), or None if malformed
+        """
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ")
+            headers = {}
+            for line in lines[1:]:
+                if line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            return None
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, target.split("?", 1)[0], headers, keep_alive
+
+    async def dispatch(self, method, path, body):
+        """
+        Route a request
+
+        Returns:
+            tuple: Status, payload (bytes, or a dict sent as JSON) and extra headers
+        """
+        routes = {"/generate": "POST", "/metrics": "GET", "/health": "GET"}
+        if path not in routes:
+            status, payload, extra_headers = 404, {"error": f"No such endpoint: {path}"}, {}
+        elif method != routes[path]:
+            status, payload, extra_headers = 405, {"error": f"{path} only accepts {routes[path]}"}, {"Allow": routes[path]}
+        elif path == "/generate":
+            status, payload, extra_headers = await self.generate(body)
+        elif path == "/metrics":
+            status, payload, extra_headers = 200, self.metrics.snapshot(self.pending, self.workers, self.max_pending), {}
+        else:
+            status, payload, extra_headers = 200, {"status": "ok"}, {}
+
+        self.metrics.statuses[status] += 1
+        return status, payload, extra_headers
+
+    async def generate(self, body):
+        """Render the workbook for a JSON config body"""
+        try:
+            request_config = json.loads(body or b"{}")
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}, {}
+        if not isinstance(request_config, dict):
+            return 400, {"error": "The body must be a JSON object"}, {}
+        for key in _SERVER_ONLY_KEYS:
+            request_config.pop(key, None)
+
+        try:
+            months = self._month_count(request_config)
+        except (ValueError, TypeError, AttributeError) as e:
+            return 422, {"error": f"Invalid config: {e}"}, {}
+        if months > self.max_months:
+            return 422, {"error": f"The date range spans {months} months, at most {self.max_months} are rendered per request"}, {}
+
+        # Backpressure: refuse rather than queue once every slot is taken
+        if self.pending >= self.max_pending:
+            self.metrics.rejected += 1
+            return 503, {"error": "Too many pending requests"}, {"Retry-After": "1"}
+
+        self.pending += 1
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self.executor, _render_request, request_config)
+        future.add_done_callback(self._release_slot)
+        try:
+            file_name, data = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timed_out += 1
+            self.logger.warning(f"Request timed out after {self.timeout}s")
+            return 504, {"error": f"Generation took longer than {self.timeout}s"}, {}
+        except (ValueError, TypeError, KeyError) as e:
+            return 422, {"error": f"Invalid config: {e}"}, {}
+        except Exception as e:
+            # The message may name server paths, so it only goes to the log
+            self.logger.error(f"Generation failed: {e}")
+            return 500, {"error": "Generation failed"}, {}
+
+        elapsed = time.perf_counter() - start
+        self.metrics.record_render(elapsed)
+        logging.getLogger('FuelLogGenerator.detail').info(f"Generated {file_name} ({len(data)} bytes) in {elapsed * 1000:.0f}ms")
+        return 200, data, {
+            "Content-Type": XLSX_CONTENT_TYPE,
+            "Content-Disposition": _content_disposition(file_name)
+        }
+
+    def _month_count(self, request_config):
+        """Month sheets a request would render, from its dates or the base config's"""
+        dates = []
+        for key in ("start_date", "end_date"):
+            value = request_config.get(key, self.base_config[key])
+            dates.append(datetime.strptime(value, "%Y-%m-%d") if isinstance(value, str) else value)
+        start_date, end_date = dates
+        return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+
+    def _release_slot(self, future):
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception()  # Marks failures of timed-out renders as retrieved
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive, extra_headers=None):
+        headers = {"Content-Type": "application/json"}
+        if isinstance(payload, dict):
+            payload = json.dumps(payload).encode()
+        headers.update(extra_headers or {})
+        headers["Content-Length"] = str(len(payload))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+        head = f"HTTP/1.1 {status} {REASONS[status]}\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+        await writer.drain()
+
+
+async def _serve(service, host, port):
+    await service.start_pool()
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    address = server.sockets[0].getsockname()
+    service.logger.info(
+        f"Serving on http://{address[0]}:{address[1]} with {service.workers} workers, "
+        f"{service.max_pending} pending requests at most and a {service.timeout}s timeout"
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def serve(base_config=None, host="127.0.0.1", port=8080, workers=None, max_pending=None, timeout=30.0, max_months=MAX_MONTHS):
+    """
+    Run the generation service until interrupted
+
+    Args:
+        base_config (dict): Settings every request is merged into
+        host (str): Interface to listen on
+        port (int): Port to listen on; 0 picks a free one
+        workers (int): Worker processes (default: CPU count)
+        max_pending (int): Renders accepted at once before answering 503 (default: twice the workers)
+        timeout (float): Seconds a request waits for its workbook before answering 504
+        max_months (int): Month sheets one request may span before answering 422
+    """
+    service = GenerationService(base_config, workers, max_pending, timeout, max_months)
+    try:
+        asyncio.run(_serve(service, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
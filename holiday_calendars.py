@@ -0,0 +1,120 @@
+"""
+Named holiday calendars, loaded once per process and shared by every generator
+
+A calendar is a JSON file ``<name>.json`` in the calendars directory holding a
+``holidays`` list of ``YYYY-MM-DD`` dates, or a mapping of dates to holiday
+names. Configs reference a calendar by name and can list extra dates of their
+own. Calendars are parsed once and every (calendar, extra dates) combination is
+resolved once, so the thousands of employees of a roster batch sharing a
+calendar share one frozen set, and the workday masks memoized on it in
+``trip_plan``.
+"""
+from datetime import date, datetime
+from functools import lru_cache
+import json
+import os
+
+# Calendars shipped with the generator
+CALENDAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calendars")
+
+# (directory, name) -> frozenset of dates
+_calendars = {}
+
+
+def _parse_dates(values):
+    """
+    Parse ``YYYY-MM-DD`` strings, dates or datetimes
+
+    Returns:
+        tuple: Frozen set of dates and a tuple of the values that couldn't be parsed
+    """
+    dates = set()
+    invalid = []
+    for value in values:
+        if isinstance(value, datetime):
+            dates.add(value.date())
+        elif isinstance(value, date):
+            dates.add(value)
+        else:
+            try:
+                dates.add(datetime.strptime(value, "%Y-%m-%d").date())
+            except (TypeError, ValueError):
+                invalid.append(value)
+    return frozenset(dates), tuple(invalid)
+
+
+def available_calendars(directory=None):
+    """Names of the calendars in a directory"""
+    try:
+        names = os.listdir(directory or CALENDAR_DIR)
+    except OSError:
+        return []
+    return sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+
+
+def load_calendar(name, directory=None):
+    """
+    Holiday dates of a named calendar, read from disk on first use only
+
+    Only names listed by available_calendars are opened, so a name can't
+    reach files outside the directory.
+
+    Args:
+        name (str): Calendar name, matched case-insensitively against the file names
+        directory (str): Directory holding the calendars (default: CALENDAR_DIR)
+
+    Returns:
+        frozenset: The calendar's dates
+
+    Raises:
+        ValueError: If the calendar doesn't exist, can't be read, has no holidays list
+            or lists an invalid date
+    """
+    directory = directory or CALENDAR_DIR
+    key = (directory, name.lower())
+    if key not in _calendars:
+        available = available_calendars(directory)
+        if name.lower() not in available:
+            raise ValueError(f"Unknown holiday calendar: {name} (available: {', '.join(available) or 'none'})")
+
+        try:
+            with open(os.path.join(directory, f"{name.lower()}.json"), 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            # Neither the path nor the parser's excerpt of the file is passed on
+            raise ValueError(f"Holiday calendar {name} can't be read") from None
+
+        holidays = data.get("holidays") if isinstance(data, dict) else None
+        if not isinstance(holidays, (list, dict)):
+            raise ValueError(f"Holiday calendar {name}: missing 'holidays' list")
+        dates, invalid = _parse_dates(holidays)
+        if invalid:
+            raise ValueError(f"Invalid dates in holiday calendar {name}: {', '.join(map(str, invalid))}")
+        _calendars[key] = dates
+    return _calendars[key]
+
+
+def resolve_holidays(calendar=None, extra=(), directory=None):
+    """
+    Effective holidays of a config: a named calendar plus extra dates
+
+    Args:
+        calendar (str): Calendar name, or None for extra dates only
+        extra (iterable): Additional ``YYYY-MM-DD`` strings, dates or datetimes
+        directory (str): Directory holding the calendars (default: CALENDAR_DIR)
+
+    Returns:
+        tuple: Frozen set of dates, the same object for every config with the same
+            calendar and extra dates, and a tuple of extra values that couldn't be parsed
+    """
+    if calendar is not None and not isinstance(calendar, str):
+        raise ValueError(f"Invalid holiday calendar: {calendar!r}")
+    return _resolve(directory or CALENDAR_DIR, calendar.lower() if calendar else None, tuple(extra))
+
+
+@lru_cache(maxsize=4096)
+def _resolve(directory, calendar, extra):
+    holidays, invalid = _parse_dates(extra)
+    if calendar:
+        holidays = holidays | load_calendar(calendar, directory)
+    return holidays, invalid
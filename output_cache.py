@@ -0,0 +1,184 @@
+"""Content-addressed cache of generated workbooks and month sheets, so unchanged log books are not rebuilt"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# Stores within this many seconds of the last eviction pass skip it, so a roster
+# batch writing thousands of entries doesn't scan the cache after each one
+EVICT_INTERVAL_SECONDS = 60
+
+
+def file_sha256(path):
+    """SHA-256 of a file's contents, or None if it can't be read"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class OutputCache:
+    """
+    Workbook and month sheet store keyed on hashes of the effective config
+
+    Layout of the cache directory:
+
+    - ``objects/<key>.xlsx``: the workbook generated for a config key
+    - ``objects/<key>.json``: its SHA-256 and size
+    - ``sheets/<key>.xml``: the worksheet XML of a month sheet, keyed on the
+      month's planned days and per-sheet settings
+    - ``last_evict``: touched by each eviction pass
+
+    Entries are evicted oldest-first once they exceed ``max_age_days`` or the
+    cache grows beyond ``max_mb``, at most once every EVICT_INTERVAL_SECONDS.
+    Every write goes through a temporary file and ``os.replace`` so concurrent
+    roster workers never see partial entries.
+    """
+
+    def __init__(self, directory, max_mb=512, max_age_days=30):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.objects_dir = os.path.join(directory, "objects")
+        self.sheets_dir = os.path.join(directory, "sheets")
+
+    def _object_path(self, key, extension):
+        return os.path.join(self.objects_dir, f"{key}.{extension}")
+
+    def _sheet_path(self, key):
+        return os.path.join(self.sheets_dir, f"{key}.xml")
+
+    @staticmethod
+    def _write_atomic(path, write):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        write(temp_path)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, key):
+        """Return the metadata stored for a config key, or None"""
+        meta = self._read_json(self._object_path(key, "json"))
+        if meta is None or not os.path.exists(self._object_path(key, "xlsx")):
+            return None
+        return meta
+
+    def is_intact(self, output_path, meta):
+        """True if the output file exists and matches the cached workbook byte for byte"""
+        try:
+            if os.path.getsize(output_path) != meta["size"]:
+                return False
+        except OSError:
+            return False
+        return file_sha256(output_path) == meta["sha256"]
+
+    def touch(self, key):
+        """Mark an entry as recently used so eviction keeps it"""
+        for extension in ("xlsx", "json"):
+            try:
+                os.utime(self._object_path(key, extension))
+            except OSError:
+                pass
+
+    def restore(self, key, output_path):
+        """Copy a cached workbook to the output path"""
+        self._write_atomic(output_path, lambda temp_path: shutil.copyfile(self._object_path(key, "xlsx"), temp_path))
+        self.touch(key)
+
+    def store(self, key, output_path):
+        """Record a freshly generated workbook, then evict old entries if due"""
+        meta = {
+            "key": key,
+            "sha256": file_sha256(output_path),
+            "size": os.path.getsize(output_path)
+        }
+        self._write_atomic(self._object_path(key, "xlsx"), lambda temp_path: shutil.copyfile(output_path, temp_path))
+        self._write_atomic(self._object_path(key, "json"), lambda temp_path: _dump_json(meta, temp_path))
+        self.evict_if_due()
+
+    def lookup_sheet(self, key):
+        """The cached worksheet XML of a month sheet, or None"""
+        path = self._sheet_path(key)
+        try:
+            with open(path, 'rb') as file:
+                sheet_xml = file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return sheet_xml
+
+    def store_sheet(self, key, sheet_xml):
+        """Record the worksheet XML of a freshly rendered month sheet"""
+        self._write_atomic(self._sheet_path(key), lambda temp_path: _write_bytes(sheet_xml, temp_path))
+
+    def evict_if_due(self):
+        """Run evict unless a pass ran within EVICT_INTERVAL_SECONDS, in this or another process"""
+        stamp = os.path.join(self.directory, "last_evict")
+        try:
+            if time.time() - os.stat(stamp).st_mtime < EVICT_INTERVAL_SECONDS:
+                return
+        except OSError:
+            pass  # Never evicted
+        self._write_atomic(stamp, lambda temp_path: _write_bytes(b"", temp_path))
+        self.evict()
+
+    def _entries(self):
+        """(modification time, size, files) of every cached workbook and month sheet"""
+        entries = []
+        for directory, extensions in ((self.objects_dir, ("xlsx", "json")), (self.sheets_dir, ("xml",))):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                key, _, extension = name.rpartition(".")
+                if extension != extensions[0]:
+                    continue  # Metadata or a temporary file
+                try:
+                    stat = os.stat(os.path.join(directory, name))
+                except OSError:
+                    continue  # Removed by another process
+                files = [os.path.join(directory, f"{key}.{extension}") for extension in extensions]
+                entries.append((stat.st_mtime, stat.st_size, files))
+        return entries
+
+    def evict(self):
+        """Drop entries older than the age limit, then the oldest until under the size limit"""
+        entries = self._entries()
+        entries.sort(key=lambda entry: entry[:2])
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, files in entries:
+            if now - mtime <= self.max_age_seconds and total <= self.max_bytes:
+                break
+            for path in files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+
+def _dump_json(data, path):
+    with open(path, 'w') as file:
+        json.dump(data, file)
+
+
+def _write_bytes(data, path):
+    with open(path, 'wb') as file:
+        file.write(data)
@@ -0,0 +1,210 @@
+"""
+Month sheets rendered one at a time to standalone worksheet XML, and assembled
+into a single xlsx package in month order
+
+Once the trip plan and the workday calendar are built, which fixes the opening
+odometer of every month, the months no longer depend on each other. A
+SheetRenderer keeps a workbook of its own, renders each month it is given into
+it and hands back the sheet's XML. The named styles are registered with every
+renderer's workbook in the same order before anything is rendered, so all
+renderers produce the same style tables and the sheets can share one
+``styles.xml``. The package around them comes from an empty openpyxl workbook
+with the same sheet names.
+
+Long ranges are rendered in a process pool with one renderer per worker. The
+output cache keeps rendered sheets and only renders the months whose inputs
+changed in-process.
+"""
+from functools import lru_cache
+import io
+import zipfile
+
+# Set up in each worker by _init_render_worker
+_worker_renderer = None
+
+
+def _init_render_worker(config, calendar_index, trip_plan, log_queue, level, detail_level):
+    """
+    Process pool initializer: a renderer for a generator reusing the parent's
+    workday calendar and trip plan
+    """
+    global _worker_renderer
+    from fuel_log_v2 import FuelLogGenerator, _init_worker_logging
+
+    _init_worker_logging(log_queue, level, detail_level)
+    generator = FuelLogGenerator(config)
+    generator._calendar_index = calendar_index
+    generator._trip_plan = trip_plan
+    _worker_renderer = SheetRenderer(generator)
+
+
+def _register_styles(generator):
+    """
+    Register every named style with the generator's workbook, cell formats
+    included, in a fixed order, followed by the formats of the header block's
+    merged cell borders
+    """
+    from openpyxl.worksheet.worksheet import Worksheet # type: ignore
+    from sheet_writers import OpenpyxlSheetWriter
+
+    workbook = generator.workbook
+    scratch = OpenpyxlSheetWriter(Worksheet(workbook), generator.cell_styles, generator._get_style_arrays())
+    for style in generator.cell_styles:
+        workbook._cell_styles.add(scratch._style_array(style))
+
+    # The header block's merged ranges get borders of their own, which openpyxl adds
+    # to the tables when the cells are written; add them here so no month sheet grows the tables
+    start_date = generator.config["start_date"]
+    generator._add_sheet_headers(scratch, start_date.year, start_date.month, generator.config["initial_odometer"])
+    for _, cell in sorted(scratch.ws._cells.items()):
+        cell.style_id
+
+
+class SheetRenderer:
+    """
+    Renders the months of a generator's config to worksheet XML
+
+    The renderer replaces the generator's workbook with one holding every named
+    style, see _register_styles. ``base_styles`` is that workbook's
+    ``styles.xml`` before any month is rendered; sheets rendered with the same
+    generator version share it.
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+        generator.workbook = generator._create_workbook(write_only=False)
+        generator._header_template = None
+        _register_styles(generator)
+        self._styles = (None, None)
+        self.base_styles = self._current_styles()
+
+    def _current_styles(self):
+        from openpyxl.styles.stylesheet import write_stylesheet # type: ignore
+        from openpyxl.xml.functions import tostring # type: ignore
+
+        # Tables only grow, so styles.xml is rendered again only when one of them has
+        workbook = self.generator.workbook
+        sizes = tuple(map(len, (workbook._fonts, workbook._fills, workbook._borders,
+                                workbook._number_formats, workbook._cell_styles)))
+        if self._styles[0] != sizes:
+            self._styles = (sizes, tostring(write_stylesheet(workbook)))
+        return self._styles[1]
+
+    def render(self, year, month):
+        """
+        Render one month sheet
+
+        Returns:
+            tuple: The sheet's XML and the workbook's ``styles.xml``
+        """
+        from openpyxl.worksheet._writer import WorksheetWriter # type: ignore
+
+        ws = self.generator._create_month_sheet(year, month)
+        writer = WorksheetWriter(ws, out=io.BytesIO())
+        with self.generator._phase("stream"):
+            writer.write()
+        # The style tables and the compiled header template are kept for the next month
+        self.generator.workbook.remove(ws)
+        return writer.read(), self._current_styles()
+
+
+def _render_month(year, month):
+    """
+    Worker entry point: render one month sheet
+
+    Returns:
+        tuple: The sheet's XML, the workbook's ``styles.xml`` and the sheet's
+            metrics, or None when metrics are disabled
+    """
+    generator = _worker_renderer.generator
+    if generator.config["metrics"]["enabled"]:
+        from generation_metrics import GenerationMetrics
+
+        generator.metrics = GenerationMetrics()
+
+    sheet_xml, styles = _worker_renderer.render(year, month)
+    sheet_metrics = generator.metrics.sheets[0] if generator.metrics is not None else None
+    return sheet_xml, styles, sheet_metrics
+
+
+def render_months(generator, months, jobs):
+    """
+    Render month sheets in worker processes
+
+    Args:
+        generator (FuelLogGenerator): Generator whose config is rendered
+        months (list): (year, month) pairs
+        jobs (int): Number of worker processes
+
+    Returns:
+        list: (sheet XML, styles.xml, sheet metrics) per month, in month order
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+    from fuel_log_v2 import _start_worker_log_forwarder
+
+    # Workers only render sheets; the parent exports, caches and saves
+    config = dict(generator.config, jobs=1)
+    initargs = (config, generator._get_calendar_index(), generator._get_trip_plan())
+
+    context = multiprocessing.get_context()
+    worker_logging, forwarder = _start_worker_log_forwarder(context)
+    try:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(months)), mp_context=context,
+                                 initializer=_init_render_worker, initargs=initargs + worker_logging) as executor:
+            return list(executor.map(_render_month, *zip(*months)))
+    finally:
+        if forwarder is not None:
+            forwarder.stop()
+
+
+@lru_cache(maxsize=64)
+def _skeleton(sheet_names):
+    """
+    An empty workbook with the given sheets, which supplies the workbook part,
+    relationships and content types; memoized, as roster records mostly share a range
+
+    Returns:
+        tuple: The xlsx contents and the archive path of each sheet
+    """
+    import openpyxl # type: ignore
+
+    skeleton = openpyxl.Workbook()
+    skeleton.remove(skeleton.active)
+    for name in sheet_names:
+        skeleton.create_sheet(title=name)
+    buffer = io.BytesIO()
+    skeleton.save(buffer)
+    return buffer.getvalue(), tuple(ws.path[1:] for ws in skeleton.worksheets)
+
+
+def write_package(sheet_names, parts, output):
+    """
+    Assemble rendered month sheets into one xlsx package
+
+    Args:
+        sheet_names (list): Sheet titles in month order
+        parts (list): Results of render_months for the same months
+        output (str or file-like): Path or binary stream to write the package to
+
+    Raises:
+        RuntimeError: If the sheets were rendered with different style tables
+    """
+    from openpyxl.packaging.core import DocumentProperties # type: ignore
+    from openpyxl.xml.constants import ARC_CORE, ARC_STYLE # type: ignore
+    from openpyxl.xml.functions import tostring # type: ignore
+
+    styles = parts[0][1]
+    if any(part_styles != styles for _, part_styles, _ in parts):
+        raise RuntimeError("Month sheets were rendered with different style tables")
+
+    skeleton, sheet_paths = _skeleton(tuple(sheet_names))
+    replacements = {path: sheet_xml for path, (sheet_xml, _, _) in zip(sheet_paths, parts)}
+    replacements[ARC_STYLE] = styles
+    # The skeleton may be older than this workbook, so its creation time is renewed
+    replacements[ARC_CORE] = tostring(DocumentProperties().to_tree())
+
+    with zipfile.ZipFile(io.BytesIO(skeleton)) as source, zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as package:
+        for info in source.infolist():
+            data = replacements.get(info.filename)
+            package.writestr(info, source.read(info) if data is None else data)
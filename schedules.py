@@ -0,0 +1,136 @@
+"""
+Effective-dated schedules of the reimbursement rate and the daily distance
+
+A schedule is a base value plus changes keyed on the date they take effect:
+
+    "inr_per_km": 10,
+    "schedules": {"inr_per_km": {"2025-10-01": 12, "2026-04-01": 13}}
+
+Change dates are kept sorted, so the value in effect on a day is found by
+binary search: ``bisect`` for single days and per-month segments, and one
+``np.searchsorted`` call for every day of a trip plan at once. A config without
+changes resolves to the plain base value and takes the constant code paths.
+Resolved schedules are memoized, so the employees of a roster batch listing
+the same changes share one Schedule, and the month totals memoized on it.
+"""
+from bisect import bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+
+def _number(value, name):
+    """A schedule value as int or float; numeric strings, such as CSV roster cells, are accepted"""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"Invalid {name} value: {value!r}")
+
+
+def _effective_date(value, name):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} schedule date: {value!r}") from None
+
+
+class Schedule:
+    """
+    A value that changes on given dates
+
+    Attributes:
+        base: Value in effect before the first change
+        dates (list): Change dates in ascending order
+        values (list): Value in effect from each change date on
+    """
+
+    __slots__ = ("base", "dates", "values", "_day_numbers", "_lookup")
+
+    def __init__(self, base, changes):
+        """
+        Args:
+            base (int or float): Value before the first change
+            changes (dict): Values keyed on the date they take effect from
+        """
+        self.base = base
+        ordered = sorted(changes.items())
+        self.dates = [day for day, _ in ordered]
+        self.values = [value for _, value in ordered]
+        # Lookup tables for searchsorted: index 0 holds the base value for days before the first change
+        self._day_numbers = np.array(self.dates, dtype="datetime64[D]")
+        self._lookup = np.array([base] + self.values)
+        self._day_numbers.setflags(write=False)
+        self._lookup.setflags(write=False)
+
+    def __repr__(self):
+        return f"Schedule({self.base!r}, {dict(zip(self.dates, self.values))!r})"
+
+    def at(self, day):
+        """Value in effect on a day"""
+        index = bisect_right(self.dates, day)
+        return self.values[index - 1] if index else self.base
+
+    def on_days(self, days):
+        """Values in effect on each of a sorted or unsorted ``datetime64[D]`` array of days"""
+        return self._lookup[np.searchsorted(self._day_numbers, days, side="right")]
+
+    def month_segments(self, year, month):
+        """
+        Split a month where the value changes
+
+        Returns:
+            list: (first day offset, value) pairs covering the month, the first at offset 0
+        """
+        first_day = date(year, month, 1)
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        segments = [(0, self.at(first_day))]
+        for index in range(bisect_right(self.dates, first_day), len(self.dates)):
+            if self.dates[index] >= next_month:
+                break
+            segments.append(((self.dates[index] - first_day).days, self.values[index]))
+        return segments
+
+
+def resolve_schedule(name, base, changes):
+    """
+    Resolve a configured value and its changes
+
+    Args:
+        name (str): Config key, for error messages
+        base: The key's configured value
+        changes (dict): ``YYYY-MM-DD`` dates (or dates) mapped to the value
+            from that day on; None entries, such as a roster record dropping an
+            inherited change, are ignored
+
+    Returns:
+        The base value when nothing changes, else a Schedule
+
+    Raises:
+        ValueError: If the changes aren't a mapping, or a date or value can't be parsed
+    """
+    if changes is not None and not isinstance(changes, dict):
+        raise ValueError(f"Invalid {name} schedule, expected a mapping of dates to values: {changes!r}")
+    try:
+        return _resolve_schedule(name, base, tuple((changes or {}).items()))
+    except TypeError:
+        raise ValueError(f"Invalid {name} schedule: {changes!r}") from None
+
+
+@lru_cache(maxsize=1024)
+def _resolve_schedule(name, base, changes):
+    """resolve_schedule for changes as a tuple of (date, value) pairs"""
+    base = _number(base, name)
+    changes = {_effective_date(day, name): _number(value, name) for day, value in changes if value is not None}
+    return Schedule(base, changes) if changes else base
@@ -0,0 +1,311 @@
+"""
+Sheet writer backends for FuelLogGenerator
+
+Month sheets are rendered through a small interface, ``write``, ``merge``,
+``set_width`` and ``stamp``, with 1-based rows and columns and cell styles
+referenced by name. ``openpyxl`` renders into worksheet cell objects;
+``xlsxwriter`` buffers one sheet at a time and writes it out in row order with
+the constant_memory option, so memory stays flat however many sheets are written.
+"""
+from copy import copy
+
+WRITERS = ("openpyxl", "xlsxwriter")
+
+
+def cell_position(cell_ref):
+    """Convert an A1 style reference to a 1-based (row, column) pair"""
+    letters = cell_ref.rstrip("0123456789")
+    column = 0
+    for letter in letters:
+        column = column * 26 + ord(letter) - 64
+    return int(cell_ref[len(letters):]), column
+
+
+class RecordingSheetWriter:
+    """Writer that only records cells and merges, used to capture a reusable header template"""
+
+    def __init__(self):
+        self.cells = {}
+        self.merged = []
+
+    def write(self, row, column, value, style=None):
+        self.cells[(row, column)] = (value, style)
+
+    def merge(self, first_row, first_column, last_row, last_column):
+        self.merged.append((first_row, first_column, last_row, last_column))
+
+    def template(self):
+        """
+        Returns:
+            dict: ``cells`` as (row, column, value, style) tuples in row order and ``merged`` ranges
+        """
+        cells = [(row, column, value, style) for (row, column), (value, style) in sorted(self.cells.items())]
+        return {"cells": cells, "merged": list(self.merged)}
+
+
+class OpenpyxlSheetWriter:
+    """
+    Writes into an openpyxl worksheet, regular or a streaming buffer
+
+    Each named style is registered with the workbook's style tables the first
+    time it is used, as one openpyxl StyleArray holding its font, fill, border
+    and alignment ids. Styling a cell is then a single array copy instead of
+    four attribute assignments that each look the style up again, and the
+    workbook only ever holds the styles that are actually used.
+    """
+
+    def __init__(self, ws, cell_styles, style_arrays=None):
+        """
+        Args:
+            ws (Worksheet): Target worksheet
+            cell_styles (dict): Style name to a dict of openpyxl style attributes
+            style_arrays (dict): Styles already registered with the worksheet's
+                workbook, shared by all its sheets and filled in as styles are used
+        """
+        self.ws = ws
+        self.cell_styles = cell_styles
+        self.style_arrays = {} if style_arrays is None else style_arrays
+
+    def _style_array(self, style):
+        """StyleArray of a named style, registering it with the workbook on first use"""
+        style_array = self.style_arrays.get(style)
+        if style_array is None:
+            from openpyxl.cell import Cell # type: ignore
+
+            cell = Cell(self.ws)
+            for attribute, style_object in self.cell_styles[style].items():
+                setattr(cell, attribute, style_object)
+            style_array = self.style_arrays[style] = cell._style
+        return style_array
+
+    def write(self, row, column, value, style=None):
+        """Set a cell value, applying a named style; ``None`` keeps the cell's current style"""
+        cell = self.ws.cell(row=row, column=column)
+        cell.value = value
+        if style is not None:
+            cell._style = copy(self._style_array(style))
+
+    def merge(self, first_row, first_column, last_row, last_column):
+        self.ws.merge_cells(start_row=first_row, start_column=first_column, end_row=last_row, end_column=last_column)
+
+    def set_width(self, col_letter, width):
+        self.ws.column_dimensions[col_letter].width = width
+
+    def stamp(self, template):
+        """
+        Copy a header template into the sheet
+
+        The template is rendered once into a detached sheet sharing the workbook's
+        style tables, and the resulting cells, merged cell borders included, are
+        cached on the template and copied from then on.
+        """
+        from openpyxl.cell import Cell, MergedCell # type: ignore
+        from openpyxl.worksheet.merge import MergedCellRange # type: ignore
+
+        if "openpyxl" not in template:
+            template["openpyxl"] = self._compile_template(template)
+
+        cells, merged = template["openpyxl"]
+        ws = self.ws
+        for row, column, value, style_array, is_merged in cells:
+            if is_merged:
+                cell = MergedCell(ws, row=row, column=column)
+                cell._style = copy(style_array)
+            else:
+                cell = Cell(ws, row=row, column=column, value=value, style_array=copy(style_array))
+            ws._cells[(row, column)] = cell
+
+        for coord in merged:
+            ws.merged_cells.add(MergedCellRange(ws, coord))
+
+    def _compile_template(self, template):
+        """
+        Render a template into a scratch sheet
+
+        Returns:
+            tuple: (row, column, value, style_array, is_merged) cell tuples and merged range coordinates
+        """
+        from openpyxl.cell import MergedCell # type: ignore
+        from openpyxl.worksheet.worksheet import Worksheet # type: ignore
+
+        scratch = OpenpyxlSheetWriter(Worksheet(self.ws.parent, title="HeaderTemplate"), self.cell_styles, self.style_arrays)
+        for row, column, value, style in template["cells"]:
+            scratch.write(row, column, value, style)
+        for merged_range in template["merged"]:
+            scratch.merge(*merged_range)
+
+        cells = [
+            (row, column, cell.value, copy(cell._style), isinstance(cell, MergedCell))
+            for (row, column), cell in sorted(scratch.ws._cells.items())
+        ]
+        return cells, [merged_range.coord for merged_range in scratch.ws.merged_cells.ranges]
+
+    def cell_counts(self):
+        """Number of cells in the sheet and how many of them are styled"""
+        cells = self.ws._cells.values()
+        return len(cells), sum(1 for cell in cells if cell.has_style)
+
+
+def _xlsxwriter_format(style):
+    """Translate a dict of openpyxl style objects into xlsxwriter format properties"""
+    properties = {}
+
+    font = style.get("font")
+    if font is not None:
+        if font.name:
+            properties["font_name"] = font.name
+        if font.sz:
+            properties["font_size"] = font.sz
+        if font.b:
+            properties["bold"] = True
+        if font.u == "single":
+            properties["underline"] = 1
+        if font.color is not None and font.color.rgb:
+            properties["font_color"] = "#" + font.color.rgb[-6:]
+
+    fill = style.get("fill")
+    if fill is not None and fill.fill_type == "solid":
+        properties["pattern"] = 1
+        properties["bg_color"] = "#" + fill.start_color.rgb[-6:]
+
+    border = style.get("border")
+    if border is not None:
+        for side_name in ("left", "right", "top", "bottom"):
+            side = getattr(border, side_name)
+            if side is not None and side.border_style == "thin":
+                properties[side_name] = 1
+                if side.color is not None and side.color.rgb:
+                    properties[f"{side_name}_color"] = "#" + side.color.rgb[-6:]
+
+    alignment = style.get("alignment")
+    if alignment is not None:
+        if alignment.horizontal:
+            properties["align"] = alignment.horizontal
+        if alignment.vertical:
+            properties["valign"] = "vcenter" if alignment.vertical == "center" else alignment.vertical
+        if alignment.wrap_text:
+            properties["text_wrap"] = True
+
+    return properties
+
+
+# xlsxwriter releases the xlsxwriter writer is tested with, as [minimum, maximum):
+# merged ranges are registered on Worksheet.merge directly, see XlsxWriterSheetWriter.close
+XLSXWRITER_VERSIONS = ((3, 0), (4, 0))
+
+
+class XlsxWriterWorkbook:
+    """xlsxwriter workbook in constant_memory mode, mirroring the openpyxl layout"""
+
+    def __init__(self, output, cell_styles, in_memory=False, shared_strings=False):
+        """
+        Args:
+            output (str or file-like): Output file path or binary stream
+            cell_styles (dict): Style name to a dict of openpyxl style attributes
+            in_memory (bool): Assemble the file in memory instead of temporary files;
+                sheets are then kept in memory until saved
+            shared_strings (bool): Store each distinct text once in a shared string
+                table instead of inline in every cell; like ``in_memory``, this
+                gives up constant_memory, so sheets are kept until saved
+        """
+        try:
+            import xlsxwriter # type: ignore
+        except ImportError as e:
+            raise ImportError("The xlsxwriter writer needs the xlsxwriter package: pip install 'xlsxwriter>=3.0,<4'") from e
+
+        version = tuple(int(part) for part in xlsxwriter.__version__.split(".")[:2])
+        if not XLSXWRITER_VERSIONS[0] <= version < XLSXWRITER_VERSIONS[1]:
+            raise ImportError(f"The xlsxwriter writer needs xlsxwriter>=3.0,<4, found {xlsxwriter.__version__}: "
+                              "pip install 'xlsxwriter>=3.0,<4'")
+
+        if in_memory:
+            options = {"in_memory": True}
+        elif shared_strings:
+            options = {}
+        else:
+            options = {"constant_memory": True}
+        self.workbook = xlsxwriter.Workbook(output, options)
+        # Formats are registered once per workbook and shared by every sheet
+        self.formats = {name: self.workbook.add_format(_xlsxwriter_format(style)) for name, style in cell_styles.items()}
+
+    def add_sheet(self, title):
+        """Start a sheet; it is written out when the returned writer is closed"""
+        return XlsxWriterSheetWriter(self.workbook.add_worksheet(title), self.formats)
+
+    def save(self):
+        self.workbook.close()
+
+
+class XlsxWriterSheetWriter:
+    """
+    Buffers one sheet, then writes it to xlsxwriter in row order
+
+    constant_memory mode flushes a row as soon as a later row is written, but
+    the header references (H8, I7) are only known once the data rows are done,
+    so a month's cells are collected first. Only one sheet is held at a time.
+    """
+
+    def __init__(self, worksheet, formats):
+        self.worksheet = worksheet
+        self.formats = formats
+        self.cells = {}
+        self.merged = []
+        self.widths = {}
+
+    def write(self, row, column, value, style=None):
+        """Set a cell value, applying a named style; ``None`` keeps the cell's current style"""
+        if style is None:
+            style = self.cells.get((row, column), (None, None))[1]
+        self.cells[(row, column)] = (value, style)
+
+    def merge(self, first_row, first_column, last_row, last_column):
+        self.merged.append((first_row, first_column, last_row, last_column))
+
+    def set_width(self, col_letter, width):
+        self.widths[cell_position(f"{col_letter}1")[1]] = width
+
+    def stamp(self, template):
+        """Copy a header template into the sheet"""
+        for row, column, value, style in template["cells"]:
+            self.cells[(row, column)] = (value, style)
+        self.merged.extend(template["merged"])
+
+    def cell_counts(self):
+        """Number of cells in the sheet and how many of them are styled"""
+        return len(self.cells), sum(1 for _, style in self.cells.values() if style is not None)
+
+    def close(self):
+        """Write the buffered sheet out and release it"""
+        worksheet = self.worksheet
+        for column, width in self.widths.items():
+            # Pixel widths make xlsxwriter store the same column width openpyxl does
+            worksheet.set_column_pixels(column - 1, column - 1, round(width * 7))
+
+        # Like merge_range(), give the covered cells of a merged range the format of its first cell
+        for first_row, first_column, last_row, last_column in self.merged:
+            style = self.cells.get((first_row, first_column), (None, None))[1]
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    if (row, column) != (first_row, first_column):
+                        self.cells[(row, column)] = (None, style)
+
+        for (row, column), (value, style) in sorted(self.cells.items()):
+            cell_format = self.formats[style] if style is not None else None
+            if value is None or value == "":
+                if cell_format is not None:
+                    worksheet.write_blank(row - 1, column - 1, None, cell_format)
+            elif isinstance(value, str):
+                worksheet.write_string(row - 1, column - 1, value, cell_format)
+            else:
+                worksheet.write_number(row - 1, column - 1, value, cell_format)
+
+        # merge_range() writes whole ranges at once, which constant_memory mode
+        # drops for ranges spanning rows, so the cells were written above in row
+        # order and only the range is registered here. Worksheet.merge isn't
+        # public, hence XLSXWRITER_VERSIONS
+        for first_row, first_column, last_row, last_column in self.merged:
+            worksheet.merge.append([first_row - 1, first_column - 1, last_row - 1, last_column - 1])
+
+        self.cells = {}
+        self.merged = []
+        return worksheet
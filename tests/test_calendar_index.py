@@ -0,0 +1,82 @@
+"""The prefix-sum calendar index against the per-month loop it replaced"""
+from datetime import datetime, timedelta
+import random
+
+import pandas as pd
+import pytest
+
+from fuel_log_v2 import FuelLogGenerator
+
+
+def _legacy_month_start_odometer(start_date, initial_odometer, work_related_km, holidays, year, month):
+    """Frozen copy of the opening odometer loop from _create_month_sheet before the calendar index"""
+    current_month_index = (year - start_date.year) * 12 + (month - start_date.month)
+
+    odometer_start = initial_odometer
+    for m_idx in range(current_month_index):
+        m_year = start_date.year + (start_date.month + m_idx - 1) // 12
+        m_month = (start_date.month + m_idx - 1) % 12 + 1
+        m_first_day = datetime(m_year, m_month, 1)
+        m_last_day = (m_first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        m_date_range = pd.date_range(start=m_first_day, end=m_last_day)
+
+        # Count only workdays (not weekends or holidays)
+        workday_count = 0
+        for d in m_date_range:
+            if d.weekday() < 5 and not any(d.date() == h.date() for h in holidays):
+                workday_count += 1
+
+        odometer_start += workday_count * work_related_km
+    return odometer_start
+
+
+def _random_case(rng):
+    start_date = datetime(rng.randint(2015, 2030), rng.randint(1, 12), rng.randint(1, 28))
+    months = rng.randint(1, 36)
+    last_month = start_date.month - 1 + months - 1
+    end_date = datetime(start_date.year + last_month // 12, last_month % 12 + 1, rng.randint(1, 28))
+
+    span = (end_date - start_date).days + 31
+    holidays = {start_date.replace(day=1) + timedelta(days=rng.randrange(span)) for _ in range(rng.randint(0, 40))}
+    # Always include some weekend holidays, which must not reduce the workday count twice
+    saturday = start_date + timedelta(days=(5 - start_date.weekday()) % 7)
+    holidays.update(saturday + timedelta(days=7 * week + rng.randint(0, 1)) for week in range(0, months * 4, 5))
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "initial_odometer": rng.randint(0, 100000),
+        "work_related_km": rng.randint(1, 300),
+        "holidays": sorted(holidays)
+    }
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_month_start_odometer_matches_legacy_loop(seed):
+    case = _random_case(random.Random(seed))
+    generator = FuelLogGenerator({
+        "start_date": case["start_date"].strftime("%Y-%m-%d"),
+        "end_date": case["end_date"].strftime("%Y-%m-%d"),
+        "initial_odometer": case["initial_odometer"],
+        "work_related_km": case["work_related_km"],
+        "holidays": [holiday.strftime("%Y-%m-%d") for holiday in case["holidays"]]
+    })
+
+    for year, month in generator._month_range():
+        expected = _legacy_month_start_odometer(
+            case["start_date"], case["initial_odometer"], case["work_related_km"], case["holidays"], year, month
+        )
+        assert generator._month_start_odometer(year, month) == expected, (year, month)
+
+
+def test_month_start_odometer_matches_trip_plan():
+    # The sheet's rows come from the trip plan, so its opening reading must agree with the index
+    case = _random_case(random.Random(1000))
+    generator = FuelLogGenerator({
+        "start_date": case["start_date"].strftime("%Y-%m-%d"),
+        "end_date": case["end_date"].strftime("%Y-%m-%d"),
+        "holidays": [holiday.strftime("%Y-%m-%d") for holiday in case["holidays"]]
+    })
+    plan = generator._get_trip_plan()
+    for year, month in generator._month_range():
+        assert generator._month_start_odometer(year, month) == plan.month(year, month).odometer_start[0]
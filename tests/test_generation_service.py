@@ -0,0 +1,87 @@
+"""Request validation done by the service before a render is submitted"""
+import asyncio
+import json
+
+import pytest
+
+from generation_service import GenerationService
+
+
+def _generate(service, config):
+    return asyncio.run(service.generate(json.dumps(config).encode()))
+
+
+def test_ranges_beyond_max_months_are_refused_before_rendering():
+    # No pool is started, so a request reaching the executor would fail
+    service = GenerationService(workers=1, max_months=24)
+    status, payload, _ = _generate(service, {"start_date": "1900-01-01", "end_date": "2999-12-31"})
+    assert status == 422
+    assert "13200 months" in payload["error"]
+    assert service.pending == 0
+
+
+@pytest.mark.parametrize("config, months", [
+    ({"start_date": "2025-01-15", "end_date": "2026-12-01"}, 24),
+    ({"start_date": "2025-04-01", "end_date": "2025-04-30"}, 1),
+    ({}, 8)  # The base config's default range, Aug 2024 to Mar 2025
+])
+def test_month_count(config, months):
+    assert GenerationService(workers=1)._month_count(config) == months
+
+
+def test_unparseable_dates_are_refused():
+    status, payload, _ = _generate(GenerationService(workers=1), {"start_date": "01/04/2025"})
+    assert status == 422
+    assert payload["error"].startswith("Invalid config")
+
+
+class _Writer:
+    """Collects what _respond writes to the connection"""
+
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def _download(monkeypatch, output_file_path):
+    from concurrent.futures import ThreadPoolExecutor
+    import generation_service
+
+    # Render in a thread with a stand-in for the worker, which echoes the name like _render_request
+    monkeypatch.setattr(generation_service, "_render_request", lambda config: (config["output_file_path"], b"xlsx"))
+    service = GenerationService(workers=1)
+    service.executor = ThreadPoolExecutor(1)
+    try:
+        status, payload, headers = _generate(service, {"output_file_path": output_file_path})
+    finally:
+        service.executor.shutdown()
+    assert status == 200
+
+    writer = _Writer()
+    asyncio.run(GenerationService._respond(writer, status, payload, True, headers))
+    head, _, body = writer.data.partition(b"\r\n\r\n")
+    return head.decode("ascii").split("\r\n")[1:], body
+
+
+def test_file_name_cannot_inject_headers(monkeypatch):
+    lines, body = _download(monkeypatch, 'log.xlsx"\r\nSet-Cookie: session=1\r\n')
+    assert body == b"xlsx"
+    assert not any(line.lower().startswith("set-cookie") for line in lines)
+    disposition = [line for line in lines if line.startswith("Content-Disposition: ")]
+    assert disposition == [
+        "Content-Disposition: attachment; filename=\"log.xlsxSet-Cookie: session=1\"; "
+        "filename*=UTF-8''log.xlsxSet-Cookie%3A%20session%3D1"
+    ]
+
+
+def test_non_latin1_file_name_gets_an_ascii_fallback(monkeypatch):
+    lines, body = _download(monkeypatch, "लॉग_बुक.xlsx")
+    assert body == b"xlsx"
+    disposition = next(line for line in lines if line.startswith("Content-Disposition: "))
+    assert 'filename="_______.xlsx"' in disposition
+    assert "filename*=UTF-8''%E0%A4%B2" in disposition
@@ -0,0 +1,60 @@
+"""Holiday calendar names are looked up in the calendar directory only"""
+import json
+
+import pytest
+
+from fuel_log_v2 import FuelLogGenerator
+from holiday_calendars import CALENDAR_DIR, load_calendar, resolve_holidays
+
+
+def test_shipped_calendar_loads_case_insensitively():
+    assert load_calendar("INDIA_NATIONAL") == load_calendar("india_national")
+
+
+@pytest.mark.parametrize("name", [
+    "../calendars/india_national",
+    "./india_national",
+    "sub/india_national",
+    "..",
+    "/etc/passwd",
+    "india_national.json"
+])
+def test_names_outside_the_directory_are_rejected(name):
+    with pytest.raises(ValueError, match="Unknown holiday calendar"):
+        load_calendar(name)
+
+
+def test_rejection_does_not_reveal_the_directory(tmp_path):
+    (tmp_path / "secret.json").write_text(json.dumps({"holidays": ["2025-01-01"]}))
+    calendars = tmp_path / "calendars"
+    calendars.mkdir()
+
+    with pytest.raises(ValueError) as error:
+        load_calendar("../secret", str(calendars))
+    assert str(tmp_path) not in str(error.value)
+
+
+def test_unreadable_calendar_does_not_echo_its_contents(tmp_path):
+    (tmp_path / "broken.json").write_text("not json: internal notes")
+    with pytest.raises(ValueError) as error:
+        load_calendar("broken", str(tmp_path))
+    assert "internal notes" not in str(error.value)
+    assert str(tmp_path) not in str(error.value)
+
+
+def test_calendar_must_be_a_name():
+    with pytest.raises(ValueError, match="Invalid holiday calendar"):
+        resolve_holidays(["india_national"])
+
+
+def test_generator_rejects_a_traversing_calendar():
+    with pytest.raises(ValueError, match="Unknown holiday calendar"):
+        FuelLogGenerator({"holiday_calendar": f"../{CALENDAR_DIR.rsplit('/', 1)[-1]}/india_national"})
+
+
+@pytest.mark.parametrize("data", [{"dates": ["2025-01-01"]}, ["2025-01-01"], {"holidays": "2025-01-01"}])
+def test_calendar_without_a_holidays_list_raises_value_error(tmp_path, data):
+    (tmp_path / "regional.json").write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="Holiday calendar regional: missing 'holidays' list") as error:
+        load_calendar("regional", str(tmp_path))
+    assert str(tmp_path) not in str(error.value)
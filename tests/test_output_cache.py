@@ -0,0 +1,109 @@
+"""Month sheet reuse and eviction in the output cache"""
+import os
+import time
+
+from openpyxl import load_workbook
+
+import output_cache
+from fuel_log_v2 import FuelLogGenerator
+from output_cache import OutputCache
+
+
+def _generate(tmp_path, name, cache=True, **config):
+    config = {
+        "start_date": "2025-01-01",
+        "end_date": "2025-06-30",
+        "holidays": ["2025-01-26", "2025-03-14"],
+        "output_file_path": str(tmp_path / name),
+        "cache": {"enabled": cache, "dir": str(tmp_path / "cache")},
+        **config
+    }
+    FuelLogGenerator(config).generate_workbook()
+    return config["output_file_path"]
+
+
+def _style(cell):
+    # Style ids depend on the order styles were added to the workbook, so compare the styles themselves
+    return (repr(cell.font), repr(cell.fill), repr(cell.border), repr(cell.alignment), cell.number_format)
+
+
+def _sheets(path):
+    workbook = load_workbook(path)
+    return {
+        worksheet.title: (
+            [[(cell.value, _style(cell)) for cell in row] for row in worksheet.iter_rows()],
+            sorted(str(merged) for merged in worksheet.merged_cells.ranges),
+            {column: dimension.width for column, dimension in worksheet.column_dimensions.items()}
+        )
+        for worksheet in workbook.worksheets
+    }
+
+
+def test_reused_sheets_match_a_fresh_workbook(tmp_path):
+    _generate(tmp_path, "first.xlsx")
+    cache = OutputCache(str(tmp_path / "cache"))
+    assert len(os.listdir(cache.sheets_dir)) == 6
+
+    # A holiday in April changes April's rows and the opening odometer of May and June
+    cached = _generate(tmp_path, "cached.xlsx", holidays=["2025-01-26", "2025-03-14", "2025-04-18"])
+    fresh = _generate(tmp_path, "fresh.xlsx", cache=False, holidays=["2025-01-26", "2025-03-14", "2025-04-18"])
+
+    assert len(os.listdir(cache.sheets_dir)) == 9
+    assert _sheets(cached) == _sheets(fresh)
+
+
+def test_extending_the_range_reuses_earlier_months(tmp_path, monkeypatch):
+    _generate(tmp_path, "first.xlsx")
+
+    rendered = []
+    original = FuelLogGenerator._create_month_sheet
+
+    def create_month_sheet(self, year, month):
+        rendered.append((year, month))
+        return original(self, year, month)
+
+    monkeypatch.setattr(FuelLogGenerator, "_create_month_sheet", create_month_sheet)
+    _generate(tmp_path, "extended.xlsx", end_date="2025-07-31")
+    assert rendered == [(2025, 7)]
+
+
+def test_eviction_runs_at_most_once_per_interval(tmp_path, monkeypatch):
+    cache = OutputCache(str(tmp_path / "cache"), max_mb=0)
+    passes = []
+    monkeypatch.setattr(OutputCache, "evict", lambda self: passes.append(time.time()))
+
+    for index in range(3):
+        cache.store_sheet(f"sheet{index}", b"<worksheet/>")
+        cache.evict_if_due()
+    assert len(passes) == 1
+
+    monkeypatch.setattr(output_cache, "EVICT_INTERVAL_SECONDS", 0)
+    cache.evict_if_due()
+    assert len(passes) == 2
+
+
+def test_evict_drops_oldest_sheets_beyond_the_size_limit(tmp_path):
+    cache = OutputCache(str(tmp_path / "cache"))
+    cache.max_bytes = 25
+    now = time.time()
+    for index in range(3):
+        cache.store_sheet(f"sheet{index}", b"x" * 12)
+        os.utime(cache._sheet_path(f"sheet{index}"), (now - 10 + index, now - 10 + index))
+
+    cache.evict()
+    assert cache.lookup_sheet("sheet0") is None
+    assert cache.lookup_sheet("sheet1") is not None
+    assert cache.lookup_sheet("sheet2") is not None
+
+
+def test_metrics_are_exported_on_repeat_runs(tmp_path):
+    for run in range(2):
+        metrics_path = tmp_path / f"metrics{run}.jsonl"
+        _generate(tmp_path, "log.xlsx", metrics={"enabled": True, "path": str(metrics_path)})
+        assert metrics_path.read_text().strip()
+
+
+def test_cache_is_off_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    FuelLogGenerator({"start_date": "2025-01-01", "end_date": "2025-01-31", "output_file_path": "log.xlsx"}).generate_workbook()
+    assert sorted(os.listdir(tmp_path)) == ["log.xlsx"]
@@ -0,0 +1,28 @@
+"""Parsing of effective-dated schedules"""
+import pytest
+
+from fuel_log_v2 import FuelLogGenerator
+from schedules import Schedule, resolve_schedule
+
+
+def test_changes_resolve_to_a_schedule():
+    schedule = resolve_schedule("inr_per_km", 10, {"2025-10-01": "12"})
+    assert isinstance(schedule, Schedule)
+    assert schedule.values == [12]
+    assert resolve_schedule("inr_per_km", 10, {}) == 10
+
+
+@pytest.mark.parametrize("changes", [["2025-10-01", 12], "2025-10-01=12", 12])
+def test_changes_that_are_not_a_mapping_raise_value_error(changes):
+    with pytest.raises(ValueError, match="Invalid inr_per_km schedule"):
+        resolve_schedule("inr_per_km", 10, changes)
+
+
+def test_generator_reports_a_malformed_schedule_as_value_error():
+    generator = FuelLogGenerator({"schedules": {"work_related_km": ["2025-01-01"]}})
+    with pytest.raises(ValueError, match="Invalid work_related_km schedule"):
+        generator._get_trip_plan()
+
+    generator = FuelLogGenerator({"schedules": ["inr_per_km"]})
+    with pytest.raises(ValueError, match="Invalid schedules"):
+        generator._get_trip_plan()
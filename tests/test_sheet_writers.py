@@ -0,0 +1,64 @@
+"""The xlsxwriter writer against the openpyxl layout"""
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from fuel_log_v2 import FuelLogGenerator
+
+pytest.importorskip("xlsxwriter")
+
+
+def _layout(source):
+    workbook = load_workbook(source)
+    return {
+        worksheet.title: (
+            sorted(str(merged) for merged in worksheet.merged_cells.ranges),
+            [[cell.value if cell.value != "" else None for cell in row] for row in worksheet.iter_rows()]
+        )
+        for worksheet in workbook.worksheets
+    }
+
+
+def _generate(tmp_path, writer, **config):
+    path = tmp_path / f"{writer}.xlsx"
+    FuelLogGenerator({
+        "start_date": "2025-01-01",
+        "end_date": "2025-03-31",
+        "writer": writer,
+        "output_file_path": str(path),
+        "cache": {"enabled": False},
+        **config
+    }).generate_workbook()
+    return path
+
+
+@pytest.mark.parametrize("config", [
+    {},                  # constant_memory
+    {"compact": True}    # shared strings, without constant_memory
+])
+def test_xlsxwriter_merged_ranges_match_openpyxl(tmp_path, config):
+    expected = _layout(_generate(tmp_path, "openpyxl", **config))
+    found = _layout(_generate(tmp_path, "xlsxwriter", **config))
+    assert list(found) == list(expected)
+    for title in expected:
+        assert found[title][0] == expected[title][0], title
+        assert found[title][0]  # Every sheet has a merged header
+        assert found[title][1] == expected[title][1], title
+
+
+def test_in_memory_xlsxwriter_merged_ranges_match_openpyxl():
+    config = {"start_date": "2025-01-01", "end_date": "2025-02-28"}
+    expected = _layout(io.BytesIO(FuelLogGenerator(config).generate_bytes()))
+    found = _layout(io.BytesIO(FuelLogGenerator({**config, "writer": "xlsxwriter"}).generate_bytes()))
+    assert {title: merged for title, (merged, _) in found.items()} == \
+        {title: merged for title, (merged, _) in expected.items()}
+
+
+def test_untested_xlsxwriter_versions_are_refused(monkeypatch):
+    import xlsxwriter
+    from sheet_writers import XlsxWriterWorkbook
+
+    monkeypatch.setattr(xlsxwriter, "__version__", "4.0.0")
+    with pytest.raises(ImportError, match="xlsxwriter>=3.0,<4"):
+        XlsxWriterWorkbook(io.BytesIO(), {})
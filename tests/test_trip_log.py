@@ -0,0 +1,98 @@
+"""Log book rows built from trip logs"""
+from openpyxl import load_workbook
+
+from fuel_log_v2 import FuelLogGenerator
+from workbook_audit import audit_workbook
+
+
+# 2025-06-02 is a Monday and 2025-06-07 a Saturday
+TRIPS = """timestamp,odometer_start,odometer_end,purpose
+2025-06-02 09:00,1000,1040,client visit
+2025-06-02 19:00,1040,1050,personal
+2025-06-03 10:00,1050,1062,personal
+2025-06-07 11:00,1062,1100,personal
+2025-06-09 09:00,1100,1130,client visit
+"""
+
+
+def _generator(tmp_path):
+    log_path = tmp_path / "trips.csv"
+    log_path.write_text(TRIPS)
+    return FuelLogGenerator({
+        "start_date": "2025-06-01",
+        "end_date": "2025-06-30",
+        "initial_odometer": 1000,
+        "holidays": [],
+        "trip_log": {"path": str(log_path)},
+        "output_file_path": str(tmp_path / "log.xlsx"),
+        "cache": {"enabled": False}
+    })
+
+
+def _day_row(worksheet, day):
+    # Daily rows start at row 12 with the first of the month
+    return [cell.value for cell in worksheet[11 + day]]
+
+
+def test_personal_only_days_are_not_work_rows(tmp_path):
+    generator = _generator(tmp_path)
+    generator.generate_workbook()
+    worksheet = load_workbook(generator.config["output_file_path"])["Jun25"]
+
+    work_day = _day_row(worksheet, 2)
+    assert work_day[2:9] == [1000, 1050, "Official", "Blink Charging", "Y", 40, 10]
+
+    personal_weekday = _day_row(worksheet, 3)
+    assert personal_weekday[2:11] == [1050, 1062, None, None, "N", None, 12, None, None]
+    assert worksheet.cell(row=14, column=1).style_id == worksheet.cell(row=13, column=1).style_id
+
+    personal_saturday = _day_row(worksheet, 7)
+    assert personal_saturday[2:11] == [1062, 1100, None, None, "N", None, 38, None, None]
+    assert worksheet.cell(row=18, column=1).style_id == worksheet.cell(row=19, column=1).style_id  # Saturday, Sunday
+
+    assert worksheet["H8"].value == 1130
+    assert worksheet["I7"].value == 130
+
+
+def test_personal_only_days_are_left_out_of_trip_columns(tmp_path):
+    columns = _generator(tmp_path).trip_columns()
+    trip_days = {str(day) for day in columns["date"]}
+    assert "2025-06-02" in trip_days and "2025-06-09" in trip_days
+    assert not trip_days & {"2025-06-03", "2025-06-07"}
+    assert columns["km"].sum() == 70
+
+
+def test_workbook_with_personal_only_days_passes_the_audit(tmp_path):
+    generator = _generator(tmp_path)
+    generator.generate_workbook()
+    assert audit_workbook(generator.config["output_file_path"])["mismatches"] == []
+
+
+def test_sparse_log_exports_only_the_logged_trips(tmp_path):
+    from batch_archive import manifest_row
+
+    log_path = tmp_path / "trips.csv"
+    log_path.write_text("timestamp,odometer_start,odometer_end,purpose\n2025-06-10 09:00,1000,1025,client visit\n")
+    export_path = tmp_path / "trips.csv.out"
+    generator = FuelLogGenerator({
+        "start_date": "2025-06-01",
+        "end_date": "2025-06-30",
+        "initial_odometer": 1000,
+        "holidays": [],
+        "trip_log": {"path": str(log_path)},
+        "output_file_path": str(tmp_path / "log.xlsx"),
+        "cache": {"enabled": False}
+    })
+
+    generator.export_trips(str(export_path))
+    trips = export_path.read_text().strip().splitlines()[1:]
+    assert len(trips) == 1 and "2025-06-10" in trips[0]
+    assert manifest_row(generator.config, generator.trip_columns())["work_days"] == 1
+
+    # Working days without logged driving are blank apart from the date
+    generator.generate_workbook()
+    worksheet = load_workbook(generator.config["output_file_path"])["Jun25"]
+    assert _day_row(worksheet, 11)[0] == "11/06/25"
+    assert _day_row(worksheet, 11)[2:11] == [None] * 9
+    assert _day_row(worksheet, 10)[2:9] == [1000, 1025, "Official", "Blink Charging", "Y", 25, 0]
+    assert audit_workbook(generator.config["output_file_path"])["mismatches"] == []
@@ -0,0 +1,127 @@
+"""Streaming export of trip rows to CSV, JSON Lines or Parquet, for loading into other systems"""
+import csv
+import json
+
+import numpy as np
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# Exported columns, in order
+TRIP_FIELDS = ("employee_id", "date", "odometer_start", "odometer_end", "purpose", "client", "km", "amount")
+
+
+class TripExporter:
+    """
+    Writes trip rows to one file as they arrive
+
+    CSV and JSON Lines rows are written straight through; Parquet rows are
+    buffered and written as a row group every ``batch_rows`` rows. Either way
+    memory stays bounded however many employees are exported. Parquet needs the
+    optional ``pyarrow`` package.
+    """
+
+    def __init__(self, path, output_format="csv", batch_rows=65536):
+        """
+        Args:
+            path (str): Output file, replaced if it exists
+            output_format (str): One of EXPORT_FORMATS
+            batch_rows (int): Rows per Parquet row group
+        """
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {output_format}")
+
+        self.path = path
+        self.output_format = output_format
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._batch = []
+        self._batch_size = 0
+        self._parquet_writer = None
+
+        if output_format == "parquet":
+            try:
+                import pyarrow # type: ignore
+            except ImportError as e:
+                raise ImportError("Parquet export needs the pyarrow package: pip install pyarrow") from e
+            self._file = None
+        else:
+            self._file = open(path, "w", newline="")
+            if output_format == "csv":
+                self._csv = csv.writer(self._file)
+                self._csv.writerow(TRIP_FIELDS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, columns):
+        """
+        Write a block of trip rows
+
+        Args:
+            columns (dict): Equal-length arrays keyed by TRIP_FIELDS, as returned by
+                FuelLogGenerator.trip_columns; ``date`` is ``datetime64[D]``
+        """
+        row_count = len(columns["date"])
+        if not row_count:
+            return
+
+        if self.output_format == "parquet":
+            self._batch.append(columns)
+            self._batch_size += row_count
+            if self._batch_size >= self.batch_rows:
+                self._flush_parquet()
+        else:
+            values = {name: columns[name].tolist() for name in TRIP_FIELDS if name != "date"}
+            values["date"] = np.datetime_as_string(columns["date"], unit="D").tolist()
+            rows = zip(*(values[name] for name in TRIP_FIELDS))
+            if self.output_format == "csv":
+                self._csv.writerows(rows)
+            else:
+                self._file.writelines(json.dumps(dict(zip(TRIP_FIELDS, row))) + "\n" for row in rows)
+        self.rows_written += row_count
+
+    def _flush_parquet(self):
+        """Write the buffered rows as one Parquet row group"""
+        import pyarrow as pa # type: ignore
+        import pyarrow.parquet as pq # type: ignore
+
+        if not self._batch:
+            return
+
+        # Numbers are stored as doubles so configs with fractional rates or
+        # distances share one schema with whole-number ones
+        schema = pa.schema([
+            ("employee_id", pa.string()),
+            ("date", pa.date32()),
+            ("odometer_start", pa.float64()),
+            ("odometer_end", pa.float64()),
+            ("purpose", pa.string()),
+            ("client", pa.string()),
+            ("km", pa.float64()),
+            ("amount", pa.float64())
+        ])
+        table = pa.table({
+            name: pa.array(np.concatenate([columns[name] for columns in self._batch]), type=schema.field(name).type)
+            for name in TRIP_FIELDS
+        }, schema=schema)
+
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, schema)
+        self._parquet_writer.write_table(table)
+        self._batch = []
+        self._batch_size = 0
+
+    def close(self):
+        """Flush any buffered rows and close the file"""
+        if self.output_format == "parquet":
+            self._flush_parquet()
+            if self._parquet_writer is None:
+                # No rows at all: still leave a valid, empty file behind
+                self._batch = [{name: np.array([], dtype="datetime64[D]" if name == "date" else object) for name in TRIP_FIELDS}]
+                self._flush_parquet()
+            self._parquet_writer.close()
+        else:
+            self._file.close()
@@ -0,0 +1,134 @@
+"""
+Streaming aggregation of GPS/odometer trip logs into per-day kilometres and odometer readings
+
+A trip log is a CSV export from a telematics system with one row per trip: a
+timestamp, the odometer at the start and end of the trip and optionally its
+purpose. The log is read in chunks of ``chunk_rows`` rows, and each chunk is
+folded into fixed-size per-day arrays covering the log book's range, so memory
+depends on the chunk size and the number of days, never on the size of the log.
+"""
+import numpy as np
+
+# Default CSV column names, overridden by the ``trip_log.columns`` config
+DEFAULT_COLUMNS = {
+    "timestamp": "timestamp",
+    "odometer_start": "odometer_start",
+    "odometer_end": "odometer_end",
+    "purpose": "purpose"
+}
+
+
+class DailyTrips:
+    """
+    Logged driving per calendar day, as equal-length NumPy arrays
+
+    Attributes:
+        dates (ndarray): ``datetime64[D]`` days from the first of the start month to the last of the end month
+        trips (ndarray): Number of trips started on each day
+        work_km (ndarray): Kilometres of work trips
+        personal_km (ndarray): Kilometres of personal trips
+        odometer_start (ndarray): Lowest trip start reading, NaN on days without trips
+        odometer_end (ndarray): Highest trip end reading, NaN on days without trips
+        rows_read (int): Rows read from the log
+        rows_skipped (int): Rows outside the range or with an unreadable timestamp or odometer
+    """
+
+    def __init__(self, first_day, days):
+        self.dates = np.arange(first_day, first_day + days, dtype="datetime64[D]")
+        self.trips = np.zeros(days, dtype=np.int64)
+        self.work_km = np.zeros(days)
+        self.personal_km = np.zeros(days)
+        self.odometer_start = np.full(days, np.inf)
+        self.odometer_end = np.full(days, -np.inf)
+        self.rows_read = 0
+        self.rows_skipped = 0
+
+    def add_chunk(self, timestamps, odometer_start, odometer_end, personal):
+        """
+        Fold one chunk of trips into the daily totals
+
+        Args:
+            timestamps (ndarray): ``datetime64`` trip start times, NaT where unreadable
+            odometer_start (ndarray): Float start readings, NaN where unreadable
+            odometer_end (ndarray): Float end readings, NaN where unreadable
+            personal (ndarray): True for personal trips
+        """
+        days = len(self.dates)
+        day_index = (timestamps.astype("datetime64[D]") - self.dates[0]).astype(np.int64)
+        distance = odometer_end - odometer_start
+        valid = (~np.isnat(timestamps) & (day_index >= 0) & (day_index < days)
+                 & np.isfinite(odometer_start) & np.isfinite(distance) & (distance >= 0))
+
+        self.rows_read += len(valid)
+        self.rows_skipped += len(valid) - np.count_nonzero(valid)
+
+        day_index, distance, personal = day_index[valid], distance[valid], personal[valid]
+        self.trips += np.bincount(day_index, minlength=days)
+        self.work_km += np.bincount(day_index[~personal], weights=distance[~personal], minlength=days)
+        self.personal_km += np.bincount(day_index[personal], weights=distance[personal], minlength=days)
+        np.minimum.at(self.odometer_start, day_index, odometer_start[valid])
+        np.maximum.at(self.odometer_end, day_index, odometer_end[valid])
+
+    def finish(self):
+        """Replace the placeholders of days without trips with NaN; returns self"""
+        no_trips = self.trips == 0
+        self.odometer_start[no_trips] = np.nan
+        self.odometer_end[no_trips] = np.nan
+        return self
+
+
+def aggregate_trip_log(path, start_date, end_date, columns=None, personal_purposes=("personal",), chunk_rows=65536):
+    """
+    Stream a trip log CSV and aggregate it per day
+
+    Args:
+        path (str): CSV file with a header row
+        start_date (date): Any day in the first month of the range
+        end_date (date): Any day in the last month of the range
+        columns (dict): CSV column names keyed like DEFAULT_COLUMNS; without a
+            purpose column every trip counts as work travel
+        personal_purposes (iterable): Purposes, matched case-insensitively, of personal trips
+        chunk_rows (int): Rows read at a time
+
+    Returns:
+        DailyTrips: Per-day totals for the range
+
+    Raises:
+        ValueError: If a timestamp or odometer column is missing from the log
+    """
+    import pandas as pd # type: ignore
+
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    first_day = np.datetime64(start_date, "M").astype("datetime64[D]")
+    last_day = (np.datetime64(end_date, "M") + 1).astype("datetime64[D]")
+    daily = DailyTrips(first_day, max(int((last_day - first_day).astype(np.int64)), 0))
+    personal_purposes = {purpose.lower() for purpose in personal_purposes}
+
+    header = pd.read_csv(path, nrows=0).columns
+    required = [columns[name] for name in ("timestamp", "odometer_start", "odometer_end")]
+    missing = [column for column in required if column not in header]
+    if missing:
+        raise ValueError(f"Trip log {path} has no {', '.join(missing)} column")
+    purpose_column = columns["purpose"] if columns["purpose"] in header else None
+    use_columns = required + ([purpose_column] if purpose_column else [])
+
+    # Odometer columns are parsed as numbers by the C parser; unreadable cells are coerced per chunk
+    text_columns = {columns["timestamp"]: str}
+    if purpose_column:
+        text_columns[purpose_column] = str
+    with pd.read_csv(path, usecols=use_columns, dtype=text_columns, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            timestamps = pd.to_datetime(chunk[columns["timestamp"]], errors="coerce", format="ISO8601")
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_localize(None)
+            if purpose_column:
+                personal = chunk[purpose_column].str.strip().str.lower().isin(personal_purposes).to_numpy()
+            else:
+                personal = np.zeros(len(chunk), dtype=bool)
+            daily.add_chunk(
+                timestamps.to_numpy(dtype="datetime64[ns]"),
+                pd.to_numeric(chunk[columns["odometer_start"]], errors="coerce").to_numpy(dtype=float),
+                pd.to_numeric(chunk[columns["odometer_end"]], errors="coerce").to_numpy(dtype=float),
+                personal
+            )
+    return daily.finish()
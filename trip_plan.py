@@ -0,0 +1,228 @@
+"""Vectorised day-by-day trip planning for fuel log books, independent of any output format"""
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+from schedules import Schedule
+
+# Day types, in the order they are stored in TripPlan.day_type
+DAY_WORK = 0
+DAY_WEEKEND = 1
+DAY_HOLIDAY = 2
+# A working day on which a trip log only records personal trips
+DAY_PERSONAL = 3
+# A working day on which a trip log records no driving
+DAY_IDLE = 4
+DAY_TYPE_NAMES = ("work", "weekend", "holiday", "personal", "idle")
+
+# Monday to Friday are working days
+WEEKMASK = "1111100"
+
+
+class TripPlan:
+    """
+    Columnar trip plan: one entry per calendar day, stored as equal-length NumPy arrays
+
+    Attributes:
+        dates (ndarray): ``datetime64[D]`` calendar days in ascending order
+        day_type (ndarray): DAY_WORK, DAY_WEEKEND, DAY_HOLIDAY, DAY_PERSONAL or DAY_IDLE per day
+        odometer_start (ndarray): Odometer reading at the start of each day
+        odometer_end (ndarray): Odometer reading at the end of each day
+        km (ndarray): Work-related kilometres driven (0 on weekends and holidays)
+        rate (ndarray): INR per kilometre in effect on each day
+        amount (ndarray): Reimbursable amount per day (``km * rate``)
+        personal_km (ndarray): Personal kilometres driven, only known from trip logs
+    """
+
+    __slots__ = ("dates", "day_type", "odometer_start", "odometer_end", "km", "rate", "amount", "personal_km")
+
+    def __init__(self, dates, day_type, odometer_start, odometer_end, km, rate, amount, personal_km):
+        self.dates = dates
+        self.day_type = day_type
+        self.odometer_start = odometer_start
+        self.odometer_end = odometer_end
+        self.km = km
+        self.rate = rate
+        self.amount = amount
+        self.personal_km = personal_km
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, index):
+        """Slice every column at once, returning a TripPlan view"""
+        return TripPlan(*(getattr(self, name)[index] for name in self.__slots__))
+
+    def month(self, year, month):
+        """Return the part of the plan that falls in the given month"""
+        first_day = np.datetime64(date(year, month, 1), "D")
+        next_month = (first_day.astype("datetime64[M]") + 1).astype("datetime64[D]")
+        start, end = np.searchsorted(self.dates, [first_day, next_month])
+        return self[start:end]
+
+    def rows(self):
+        """
+        Iterate over the plan as plain Python rows
+
+        Yields:
+            tuple: (date, day type name, odometer start, odometer end, km, rate, amount, personal km)
+        """
+        columns = [getattr(self, name).tolist() for name in self.__slots__]
+        columns[1] = [DAY_TYPE_NAMES[day_type] for day_type in columns[1]]
+        return zip(*columns)
+
+
+@lru_cache(maxsize=4096)
+def month_day_types(holidays, year, month):
+    """
+    Day type of every day of a month, memoized per (holidays, year, month)
+
+    Args:
+        holidays (frozenset): Holiday dates; a holiday on a weekend counts as a holiday
+        year (int): Year
+        month (int): Month
+
+    Returns:
+        ndarray: Read-only DAY_WORK, DAY_WEEKEND or DAY_HOLIDAY per day of the month
+    """
+    first_day = np.datetime64(date(year, month, 1), "D")
+    dates = np.arange(first_day, (first_day.astype("datetime64[M]") + 1).astype("datetime64[D]"))
+
+    day_type = np.where(np.is_busday(dates, weekmask=WEEKMASK), DAY_WORK, DAY_WEEKEND).astype(np.int8)
+    for holiday in holidays:
+        if holiday.year == year and holiday.month == month:
+            day_type[holiday.day - 1] = DAY_HOLIDAY
+
+    day_type.setflags(write=False)
+    return day_type
+
+
+@lru_cache(maxsize=4096)
+def month_workdays(holidays, year, month):
+    """Number of working days in a month, memoized like month_day_types"""
+    return int(np.count_nonzero(month_day_types(holidays, year, month) == DAY_WORK))
+
+
+@lru_cache(maxsize=4096)
+def month_work_km(holidays, year, month, work_related_km):
+    """
+    Work-related kilometres of a month, memoized like month_day_types
+
+    A month the schedule doesn't change in costs one memoized workday count;
+    otherwise the workdays of each segment of month_segments are counted.
+
+    Args:
+        holidays (frozenset): Holiday dates, as for month_day_types
+        year (int): Year
+        month (int): Month
+        work_related_km (int or Schedule): Kilometres per working day
+    """
+    if not isinstance(work_related_km, Schedule):
+        return month_workdays(holidays, year, month) * work_related_km
+
+    segments = work_related_km.month_segments(year, month)
+    if len(segments) == 1:
+        return month_workdays(holidays, year, month) * segments[0][1]
+
+    is_work = month_day_types(holidays, year, month) == DAY_WORK
+    ends = [offset for offset, _ in segments[1:]] + [len(is_work)]
+    return sum(int(np.count_nonzero(is_work[offset:end])) * value for (offset, value), end in zip(segments, ends))
+
+
+def _per_day(value, dates):
+    """The value in effect on each of ``dates``, for a scalar or a Schedule"""
+    return value.on_days(dates) if isinstance(value, Schedule) else np.full(len(dates), value)
+
+
+def build_trip_plan(start_date, end_date, initial_odometer, work_related_km, inr_per_km, holidays=()):
+    """
+    Plan every day from the first of the start month to the last of the end month
+
+    Day types are joined from the memoized per-month masks of month_day_types,
+    so plans sharing a holiday calendar compute each month once, and the
+    odometer is a cumulative sum of the work-related kilometres over the range.
+
+    Args:
+        start_date (date): Any day in the first month of the plan
+        end_date (date): Any day in the last month of the plan
+        initial_odometer (int): Odometer reading on the first of the start month
+        work_related_km (int or Schedule): Kilometres driven on each working day
+        inr_per_km (int or Schedule): Reimbursement rate
+        holidays (iterable): Holiday dates; a holiday on a weekend counts as a holiday.
+            Pass the same frozenset for many plans to share the month masks
+
+    Returns:
+        TripPlan: The planned days
+    """
+    dates, day_type = _plan_days(start_date, end_date, holidays)
+
+    is_work = day_type == DAY_WORK
+    km = np.where(is_work, _per_day(work_related_km, dates), 0)
+    rate = _per_day(inr_per_km, dates)
+    odometer_end = initial_odometer + np.cumsum(km)
+    odometer_start = odometer_end - km
+    amount = km * rate
+
+    return TripPlan(dates, day_type, odometer_start, odometer_end, km, rate, amount, np.zeros_like(km))
+
+
+def _plan_days(start_date, end_date, holidays):
+    """Calendar days from the first of the start month to the last of the end month, and their day types"""
+    first_day = np.datetime64(start_date, "M").astype("datetime64[D]")
+    end_month = np.datetime64(end_date, "M")
+    last_day = ((end_month + 1).astype("datetime64[D]") - 1)
+    dates = np.arange(first_day, max(last_day + 1, first_day), dtype="datetime64[D]")
+
+    holidays = frozenset(holidays)
+    months = np.arange(first_day.astype("datetime64[M]"), max(end_month + 1, first_day.astype("datetime64[M]")))
+    day_types = [month_day_types(holidays, item.year, item.month) for item in months.astype(date)]
+    day_type = np.concatenate(day_types) if day_types else np.empty(0, dtype=np.int8)
+    return dates, day_type
+
+
+def _whole_numbers(values):
+    """Values as integers when none has a fractional part, else rounded to two decimals"""
+    rounded = np.round(values, 2)
+    return rounded.astype(np.int64) if np.array_equal(rounded, np.trunc(rounded)) else rounded
+
+
+def build_trip_plan_from_log(start_date, end_date, initial_odometer, daily, inr_per_km, holidays=()):
+    """
+    Plan every day of the range from logged driving instead of a fixed daily distance
+
+    Every day with logged work trips becomes a trip day, weekend and holiday
+    trips included. Other working days become DAY_PERSONAL when only personal
+    trips were logged and DAY_IDLE when no driving was; weekends and holidays
+    without work trips keep their type. Odometer readings
+    come from the log. A day without trips keeps the previous day's closing
+    reading, or ``initial_odometer`` before the first trip.
+
+    Args:
+        start_date (date): Any day in the first month of the plan
+        end_date (date): Any day in the last month of the plan
+        initial_odometer (int): Odometer reading until the first logged trip
+        daily (DailyTrips): Per-day aggregate of the trip log for the same range
+        inr_per_km (int or Schedule): Reimbursement rate
+        holidays (iterable): Holiday dates, as for build_trip_plan
+
+    Returns:
+        TripPlan: The planned days
+    """
+    dates, day_type = _plan_days(start_date, end_date, holidays)
+    no_work = (day_type == DAY_WORK) & (daily.work_km == 0)
+    day_type[no_work] = np.where(daily.personal_km[no_work] > 0, DAY_PERSONAL, DAY_IDLE)
+    day_type[daily.work_km > 0] = DAY_WORK
+
+    # Carry the last known closing reading over days without trips
+    has_trips = daily.trips > 0
+    last_trip_day = np.maximum.accumulate(np.where(has_trips, np.arange(len(dates)), -1))
+    carried = np.where(last_trip_day >= 0, daily.odometer_end[np.maximum(last_trip_day, 0)], initial_odometer)
+    odometer_start = _whole_numbers(np.where(has_trips, daily.odometer_start, carried))
+    odometer_end = _whole_numbers(np.where(has_trips, daily.odometer_end, carried))
+
+    km = _whole_numbers(daily.work_km)
+    rate = _per_day(inr_per_km, dates)
+    amount = _whole_numbers(km * rate)
+
+    return TripPlan(dates, day_type, odometer_start, odometer_end, km, rate, amount, _whole_numbers(daily.personal_km))
@@ -0,0 +1,230 @@
+"""
+Read-only audit of generated log books
+
+Checks every month sheet against the layout FuelLogGenerator writes: the
+opening odometer (``H7``) must equal the previous month's closing reading, the
+closing reading (``H8``) and monthly distance (``I7``) must match the daily
+work and personal kilometres in columns H and I, and the total at the foot of column K must match the
+daily amounts. Workbooks are opened in openpyxl's read-only mode and each sheet
+is parsed in a single streaming pass, spread over a process pool.
+"""
+from contextlib import nullcontext
+import csv
+from datetime import datetime
+import logging
+import math
+import os
+import sys
+import time
+
+# Row of the first day of the month; rows above it hold the header block
+FIRST_DAY_ROW = 12
+
+# Columns read from each sheet, A to K
+SHEET_COLUMNS = 11
+
+REPORT_FIELDS = ("workbook", "sheet", "check", "expected", "found")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equal(a, b):
+    # Trip logs carry fractional kilometres, summed here in a different order than when written
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=0.005)
+
+
+def month_sheets(workbook):
+    """Month sheets of a workbook, named like ``Nov25``, in month order"""
+    sheets = []
+    for ws in workbook.worksheets:
+        try:
+            sheets.append((datetime.strptime(ws.title, "%b%y"), ws))
+        except ValueError:
+            continue  # Not a month sheet
+    sheets.sort(key=lambda sheet: sheet[0])
+    return sheets
+
+
+def read_month_totals(ws):
+    """
+    Read the odometer header and the daily rows of a month sheet in one pass
+
+    Args:
+        ws: Worksheet, normally a read-only one
+
+    Returns:
+        dict: ``employee_name`` (B5), ``employee_id`` (B6), ``opening`` (H7),
+            ``closing`` (H8), ``distance`` (I7), ``total`` (the trailing K total),
+            and the ``km``, ``personal_km``, ``amount`` and ``trips`` summed over the daily rows;
+            odometer values are None when not numbers
+    """
+    totals = {"employee_name": None, "employee_id": None, "opening": None, "closing": None, "distance": None,
+              "total": None, "km": 0, "personal_km": 0, "amount": 0, "trips": 0}
+    for row_number, row in enumerate(ws.iter_rows(min_row=5, max_col=SHEET_COLUMNS, values_only=True), start=5):
+        if row_number < FIRST_DAY_ROW:
+            if row_number == 5:
+                totals["employee_name"] = row[1]
+            elif row_number == 6:
+                totals["employee_id"] = row[1]
+            elif row_number == 7:
+                totals["opening"], totals["distance"] = row[7], row[8]
+            elif row_number == 8:
+                totals["closing"] = row[7]
+            continue
+
+        # Days with logged personal trips only carry their kilometres in I
+        if row[0] and _is_number(row[8]):
+            totals["personal_km"] += row[8]
+        # Working days carry their kilometres in H; weekend, holiday and filler rows are blank there
+        if _is_number(row[7]):
+            totals["trips"] += 1
+            totals["km"] += row[7]
+            totals["amount"] += row[10] if _is_number(row[10]) else 0
+        elif not row[0] and _is_number(row[10]):
+            totals["total"] = row[10]  # The month total sits in the last filler row
+
+    for key in ("opening", "closing", "distance"):
+        if not _is_number(totals[key]):
+            totals[key] = None
+    return totals
+
+
+def _check_month(sheet_name, totals, previous_closing):
+    """Mismatches of one month sheet as (sheet, check, expected, found) tuples"""
+    opening, closing, distance = totals["opening"], totals["closing"], totals["distance"]
+    if opening is None or closing is None or distance is None:
+        return [(sheet_name, "layout", "odometer numbers in H7, H8 and I7", "missing")]
+
+    mismatches = []
+    if previous_closing is not None and not _equal(opening, previous_closing):
+        mismatches.append((sheet_name, "chain", previous_closing, opening))
+
+    if totals["trips"] or totals["personal_km"]:
+        driven = totals["km"] + totals["personal_km"]
+        if not _equal(closing, opening + driven):
+            mismatches.append((sheet_name, "closing", opening + driven, closing))
+        if not _equal(distance, driven):
+            mismatches.append((sheet_name, "distance", driven, distance))
+    elif closing not in (0, opening) or not _equal(distance, closing - opening):
+        # Without workdays the generator writes 0 to H8 and the difference to I7
+        mismatches.append((sheet_name, "closing", opening, closing))
+
+    if totals["total"] is None or not _equal(totals["total"], totals["amount"]):
+        mismatches.append((sheet_name, "total", totals["amount"], totals["total"]))
+    return mismatches
+
+
+def audit_workbook(path):
+    """
+    Check every month sheet of one workbook
+
+    Returns:
+        dict: ``path``, number of ``sheets`` checked, ``mismatches`` as
+            (sheet, check, expected, found) tuples and an ``error`` message
+            when the workbook can't be read
+    """
+    from openpyxl import load_workbook # type: ignore
+
+    result = {"path": path, "sheets": 0, "mismatches": [], "error": None}
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    try:
+        sheets = month_sheets(workbook)
+        if not sheets:
+            result["mismatches"].append(("", "layout", "month sheets", "none"))
+
+        previous_month = previous_closing = None
+        for month, ws in sheets:
+            if previous_month is not None and (month.year - previous_month.year) * 12 + month.month - previous_month.month != 1:
+                result["mismatches"].append((ws.title, "gap", previous_month.strftime("%b%y"), "missing months"))
+                previous_closing = None
+
+            totals = read_month_totals(ws)
+            result["mismatches"].extend(_check_month(ws.title, totals, previous_closing))
+            result["sheets"] += 1
+
+            # H8 is 0 for a month without workdays, in which case the opening reading still holds
+            previous_month = month
+            previous_closing = totals["closing"] or totals["opening"]
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        workbook.close()
+    return result
+
+
+def find_workbooks(paths):
+    """xlsx files among ``paths``, searching directories recursively, in sorted order"""
+    workbooks = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                workbooks.extend(os.path.join(directory, name) for name in names
+                                 if name.lower().endswith(".xlsx") and not name.startswith("~$"))
+        else:
+            workbooks.append(path)
+    return sorted(workbooks)
+
+
+def run_audit(paths, jobs=1, report_path=None):
+    """
+    Audit workbooks and write a mismatch report
+
+    The report is a CSV with one ``workbook,sheet,check,expected,found`` row per
+    mismatch; unreadable workbooks get a row with check ``error``. Results keep
+    the order of the sorted workbook paths whatever the number of jobs.
+
+    Args:
+        paths (list): Workbook files and directories to search for ``.xlsx`` files
+        jobs (int): Number of worker processes; 1 audits in-process
+        report_path (str): Report file, replaced if it exists (default: standard output)
+
+    Returns:
+        dict: Counts of ``workbooks``, ``sheets``, ``mismatches`` and ``failed``
+            workbooks (mismatched or unreadable), and ``workbooks_per_s``
+    """
+    logger = logging.getLogger('FuelLogGenerator')
+    workbooks = find_workbooks(paths)
+    summary = {"workbooks": len(workbooks), "sheets": 0, "mismatches": 0, "failed": 0, "workbooks_per_s": 0.0}
+
+    start = time.perf_counter()
+    with open(report_path, 'w', newline='') if report_path else nullcontext(sys.stdout) as report:
+        writer = csv.writer(report)
+        writer.writerow(REPORT_FIELDS)
+
+        if jobs <= 1 or len(workbooks) <= 1:
+            results = map(audit_workbook, workbooks)
+            executor = None
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            # Small workbooks audit in milliseconds, so hand them out in batches
+            results = executor.map(audit_workbook, workbooks, chunksize=max(1, min(64, len(workbooks) // (jobs * 8))))
+
+        try:
+            for result in results:
+                summary["sheets"] += result["sheets"]
+                if result["error"] is not None:
+                    writer.writerow((result["path"], "", "error", "", result["error"]))
+                for mismatch in result["mismatches"]:
+                    writer.writerow((result["path"],) + mismatch)
+                summary["mismatches"] += len(result["mismatches"])
+                if result["error"] is not None or result["mismatches"]:
+                    summary["failed"] += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    summary["workbooks_per_s"] = len(workbooks) / elapsed if elapsed > 0 else 0.0
+    logger.info(f"Audited {summary['workbooks']} workbooks ({summary['sheets']} sheets) in {elapsed:.2f}s, "
+                f"{summary['workbooks_per_s']:.1f} workbooks/s: {summary['mismatches']} mismatches "
+                f"in {summary['failed']} workbooks")
+    return summary